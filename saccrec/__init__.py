@@ -2,7 +2,7 @@
 import gettext
 import sys
 from faulthandler import enable as enable_faulthandler
-from os import getpid, kill, remove, system
+from os import environ, getpid, kill, remove
 from os.path import dirname, exists, join
 
 from PySide6 import QtWidgets
@@ -13,6 +13,9 @@ from .settings import gui, initialize_screen
 
 _GUI_PID_FILE = '/tmp/saccrec_gui.pid'
 
+# Sampling rate of a virtual board to record from instead of the USB dongle
+_VIRTUAL_BOARD_VARIABLE = 'SACCREC_VIRTUAL_BOARD'
+
 
 def declare_gui_running_pid():
     with open('/tmp/saccrec_gui.pid', 'wt') as f:
@@ -43,18 +46,9 @@ def setup_i18n():
     tr.install('saccrec')
 
 
-def improve_ftdi_latency():
-    for i in range(4):
-        path = f'/dev/ttyUSB{i}'
-        if exists(path):
-            system(f'setserial {path} low_latency')
-
-
 def main():
     kill_hanged_processes()
 
-    improve_ftdi_latency()
-
     declare_gui_running_pid()
     enable_faulthandler()
 
@@ -64,7 +58,16 @@ def main():
 
     setup_i18n()
 
-    main_window = MainWindow()
+    port = None
+    if rate := environ.get(_VIRTUAL_BOARD_VARIABLE):
+        from saccrec.recording.virtual import VirtualBoard
+        from saccrec.settings import hardware
+        hardware.override_sampling_rate(int(rate))
+        virtual_board = VirtualBoard(int(rate))
+        virtual_board.start()
+        port = virtual_board.port
+
+    main_window = MainWindow(port=port)
     main_window.showMaximized()
 
     initialize_screen(main_window)
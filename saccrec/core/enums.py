@@ -45,3 +45,59 @@ class Gain(IntEnum):
             Gain.G12: '5',
             Gain.G24: '6',
         }[self]
+
+
+# '~' codes of the Cyton firmware, including the rates the serial link can not
+# carry and only the virtual board streams at
+CYTON_SAMPLE_RATE_CODES = {
+    250: '6',
+    500: '5',
+    1000: '4',
+    2000: '3',
+    4000: '2',
+    8000: '1',
+    16000: '0',
+}
+
+
+class SamplingRate(IntEnum):
+    SR250 = 250
+    SR500 = 500
+    SR1000 = 1000
+    SR2000 = 2000
+
+    @property
+    def label(self) -> str:
+        return f'{self.value} Hz'
+
+    @property
+    def settings(self) -> str:
+        return CYTON_SAMPLE_RATE_CODES[self.value]
+
+
+class BacklogPolicy(Enum):
+    DropOldest = 'drop'
+    Warn = 'warn'
+    Raise = 'raise'
+
+    @property
+    def label(self) -> str:
+        return {
+            BacklogPolicy.DropOldest: _('Drop oldest samples'),
+            BacklogPolicy.Warn: _('Warn'),
+            BacklogPolicy.Raise: _('Stop recording'),
+        }[self]
+
+
+class FillPolicy(Enum):
+    NaN = 'nan'
+    HoldLast = 'hold'
+    Linear = 'linear'
+
+    @property
+    def label(self) -> str:
+        return {
+            FillPolicy.NaN: _('Not a number'),
+            FillPolicy.HoldLast: _('Hold last value'),
+            FillPolicy.Linear: _('Linear interpolation'),
+        }[self]
@@ -9,7 +9,8 @@ def create_study(
     protocol: Protocol,
     light_intensity: int,
     output_path: str,
-    source_filename: str
+    source_filename: str,
+    test_parameters: list[dict] = None
 ) -> Study:
     study = Study(
         recorder=Recorder(
@@ -23,10 +24,15 @@ def create_study(
         obci_filename=source_filename
     )
 
-    for stimulus in protocol:
+    if test_parameters is None:
+        test_parameters = []
+
+    for index, stimulus in enumerate(protocol):
+        parameters = test_parameters[index] if index < len(test_parameters) else {}
         test = Test(
             stimulus=stimulus,
-            study=study
+            study=study,
+            **parameters
         )
 
         study.append(test)
@@ -74,3 +74,20 @@ class Screen(QtCore.QObject):
     @property
     def secondary_screen_refresh_rate(self) -> float:
         return self._secondary_screen_refresh_rate
+
+    @property
+    def count(self) -> int:
+        return len(self._screens)
+
+    def screen_rect(self, index: int) -> QtCore.QRect:
+        if 0 <= index < len(self._screens):
+            return self._screens[index].availableGeometry()
+        return self._secondary_screen_rect
+
+    def screen_refresh_rate(self, index: int) -> float:
+        if 0 <= index < len(self._screens):
+            return self._screens[index].refreshRate()
+        return self._secondary_screen_refresh_rate
+
+    def screen_name(self, index: int) -> str:
+        return self._screens[index].name()
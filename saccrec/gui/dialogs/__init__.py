@@ -1,9 +1,11 @@
 from .about import AboutDialog
 from .sdimport import SDCardImport
 from .settings import SettingsDialog
+from .station import StationDialog
 
 __all__ = [
     'AboutDialog',
     'SDCardImport',
     'SettingsDialog',
+    'StationDialog',
 ]
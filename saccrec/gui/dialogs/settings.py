@@ -1,7 +1,11 @@
+from math import isnan
+from threading import Thread
+from typing import Optional
+
 from PySide6 import QtCore, QtGui, QtWidgets
 
 from saccrec import settings
-from saccrec.core.enums import Language, Gain
+from saccrec.core.enums import Language, Gain, SamplingRate
 from saccrec.gui.widgets import ColorButton
 
 
@@ -20,7 +24,14 @@ class _GUISettingsPage(QtWidgets.QWidget):
         for lang in Language:
             self._languages_combo.addItem(lang.label, lang.value)
 
+        self._stream_fsync_edit = QtWidgets.QDoubleSpinBox()
+        self._stream_fsync_edit.setRange(0.0, 60.0)
+        self._stream_fsync_edit.setFixedWidth(85)
+        self._stream_fsync_edit.setSuffix(' s')
+        self._stream_fsync_edit.setSpecialValueText(_('Never'))
+
         layout.addRow(_('Language'), self._languages_combo)
+        layout.addRow(_('Live stream sync interval'), self._stream_fsync_edit)
         self.setLayout(layout)
 
         self.load()
@@ -28,8 +39,11 @@ class _GUISettingsPage(QtWidgets.QWidget):
     def load(self):
         self._initial_lang = settings.gui.lang
         self._languages_combo.setCurrentText(Language(self._initial_lang).label)
+        self._stream_fsync_edit.setValue(settings.gui.stream_fsync_interval)
 
     def save(self):
+        settings.gui.stream_fsync_interval = self._stream_fsync_edit.value()
+
         lang = str(self._languages_combo.currentData())
 
         if lang != self._initial_lang:
@@ -55,7 +69,7 @@ class _OpenBCIChannelWidget(QtWidgets.QFrame):
     def __init__(self, channel_number: int, parent=None):
         super(_OpenBCIChannelWidget, self).__init__(parent)
         self._channel_number = channel_number
-        self.setFixedSize(140, 100)
+        self.setFixedSize(140, 120)
         self.setFrameShape(QtWidgets.QFrame.Box)
 
         self._activated_check = QtWidgets.QCheckBox()
@@ -80,6 +94,8 @@ class _OpenBCIChannelWidget(QtWidgets.QFrame):
         srb_layout.addWidget(self._srb1_check)
         srb_layout.addWidget(self._srb2_check)
 
+        self._impedance_label = QtWidgets.QLabel('')
+
         layout = QtWidgets.QFormLayout()
         layout.addRow(
             '{channel} {number}         '.format(
@@ -90,6 +106,7 @@ class _OpenBCIChannelWidget(QtWidgets.QFrame):
         )
         layout.addRow(gain_layout)
         layout.addRow(srb_layout)
+        layout.addRow(self._impedance_label)
         layout.setSpacing(3)
 
         self.setLayout(layout)
@@ -99,12 +116,22 @@ class _OpenBCIChannelWidget(QtWidgets.QFrame):
         self._gain_label.setVisible(self._activated_check.checkState())
         self._srb1_check.setVisible(self._activated_check.checkState())
         self._srb2_check.setVisible(self._activated_check.checkState())
+        self._impedance_label.setText('')
         self.activationChanged.emit()
 
     @property
     def active(self) -> bool:
         return self._activated_check.checkState()
 
+    def set_impedance(self, value: Optional[float]):
+        if value is None or isnan(value):
+            self._impedance_label.setText('')
+        else:
+            self._impedance_label.setText('{impedance}: {value:.1f} kΩ'.format(
+                impedance=_('Impedance'),
+                value=value / 1000
+            ))
+
     def load(self):
         active = settings.hardware.channels[self._channel_number].active
         srb1 = settings.hardware.channels[self._channel_number].srb1
@@ -133,6 +160,7 @@ class _OpenBCIChannelWidget(QtWidgets.QFrame):
 
 
 class _HardwarePage(QtWidgets.QWidget):
+    impedanceChecked = QtCore.Signal(dict)
 
     def __init__(self, parent=None):
         super(_HardwarePage, self).__init__(parent)
@@ -140,14 +168,31 @@ class _HardwarePage(QtWidgets.QWidget):
         self._ports_combo = QtWidgets.QComboBox()
         self._ports_combo.setDuplicatesEnabled(False)
 
-        from saccrec.recording import CytonBoard
-        for port in CytonBoard.list_ports():
-            self._ports_combo.addItem(port, port)
+        self._configured_port = ''
+
+        from saccrec.recording import PortDiscovery
+        self._discovery = PortDiscovery.instance()
+        self._discovery.portsChanged.connect(self._on_ports_changed)
+        self._on_ports_changed(self._discovery.ports)
+
+        from saccrec.recording.decoder import EOG_CHANNELS
+        from saccrec.recording.openeog import max_sampling_rate
+
+        # Only the rates whose frames fit through the serial link
+        limit = max_sampling_rate(EOG_CHANNELS)
+
+        self._sample_rate_combo = QtWidgets.QComboBox()
+        self._sample_rate_combo.setDuplicatesEnabled(False)
+        for sr in SamplingRate:
+            if sr.value <= limit:
+                self._sample_rate_combo.addItem(sr.label, sr.value)
 
-        # self._sample_rate_combo = QtWidgets.QComboBox()
-        # self._sample_rate_combo.setDuplicatesEnabled(False)
-        # for sr in (250, 500, 1000, 2000, 4000, 8000, 16000):
-        #     self._sample_rate_combo.addItem(f'{sr} Hz', sr)
+        self._raw_capture_check = QtWidgets.QCheckBox()
+
+        self._impedance_button = QtWidgets.QPushButton(_('Check Impedance'))
+        self._impedance_button.setSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
+        self._impedance_button.pressed.connect(self._on_impedance_button_clicked)
+        self.impedanceChecked.connect(self._on_impedance_checked)
 
         channels_group = QtWidgets.QGroupBox(_('Channels'))
         self._channel_list = []
@@ -184,7 +229,9 @@ class _HardwarePage(QtWidgets.QWidget):
 
         form_layout = QtWidgets.QFormLayout()
         form_layout.addRow(_('Port'), self._ports_combo)
-        # form_layout.addRow(_('Sampling frequency'), self._sample_rate_combo)
+        form_layout.addRow(_('Sampling frequency'), self._sample_rate_combo)
+        form_layout.addRow(_('Capture raw serial data'), self._raw_capture_check)
+        form_layout.addRow(self._impedance_button)
 
         channels_layout = QtWidgets.QVBoxLayout()
         channels_layout.addLayout(top_layout)
@@ -200,6 +247,48 @@ class _HardwarePage(QtWidgets.QWidget):
 
         self.load()
 
+    def _on_ports_changed(self, ports: list[str]):
+        current = self._ports_combo.currentText() or self._configured_port
+
+        self._ports_combo.clear()
+        for port in ports:
+            self._ports_combo.addItem(port, port)
+
+        if current in ports:
+            self._ports_combo.setCurrentText(current)
+
+    def _on_impedance_button_clicked(self):
+        from saccrec.recording import CytonBoard
+
+        port = self._ports_combo.currentText()
+        board = next((board for board in CytonBoard.instances() if board.port == port), None)
+        if board is None or not board.ready:
+            QtWidgets.QMessageBox.warning(
+                self,
+                _('Impedance'),
+                _('Connect the board on {port} before checking the impedance').format(port=port)
+            )
+            return
+
+        gains = {
+            index + 1: int(Gain(channel.gain).label)
+            for index, channel in enumerate(settings.hardware.channels)
+            if channel.active
+        }
+
+        # The check streams for a few seconds, the GUI keeps running meanwhile
+        self._impedance_button.setEnabled(False)
+        Thread(
+            target=lambda: self.impedanceChecked.emit(board.check_impedance(gains)),
+            name='saccrec-impedance',
+            daemon=True
+        ).start()
+
+    def _on_impedance_checked(self, impedance: dict):
+        self._impedance_button.setEnabled(True)
+        for index, channel in enumerate(self._channel_list):
+            channel.set_impedance(impedance.get(index + 1))
+
     def _reset_available_channels(self):
         self._horizontal_channel_combo.clear()
         self._vertical_channel_combo.clear()
@@ -232,11 +321,15 @@ class _HardwarePage(QtWidgets.QWidget):
 
     def load(self):
         if (port := settings.hardware.port) != '':
+            self._configured_port = port
             self._ports_combo.setCurrentText(port)
         else:
             self._ports_combo.setCurrentIndex(0)
 
-        # self._sample_rate_combo.setCurrentText(f'{settings.hardware.sampling_rate} Hz')
+        if (index := self._sample_rate_combo.findData(settings.hardware.sampling_rate)) < 0:
+            index = self._sample_rate_combo.count() - 1
+        self._sample_rate_combo.setCurrentIndex(index)
+        self._raw_capture_check.setChecked(settings.hardware.raw_capture)
 
         for channel in self._channel_list:
             channel.load()
@@ -245,7 +338,8 @@ class _HardwarePage(QtWidgets.QWidget):
 
     def save(self):
         settings.hardware.port = str(self._ports_combo.currentData())
-        # settings.hardware.sampling_rate = int(self._sample_rate_combo.currentData())
+        settings.hardware.sampling_rate = int(self._sample_rate_combo.currentData())
+        settings.hardware.raw_capture = self._raw_capture_check.isChecked()
 
         for channel in self._channel_list:
             channel.save()
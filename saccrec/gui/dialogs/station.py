@@ -0,0 +1,58 @@
+from typing import Collection
+
+from PySide6 import QtCore, QtWidgets
+
+from saccrec import settings
+
+
+class StationDialog(QtWidgets.QDialog):
+    stationSelected = QtCore.Signal(str, int)
+
+    def __init__(self, parent=None):
+        super(StationDialog, self).__init__(parent=parent)
+
+        self.setWindowTitle(_('New Station'))
+
+        self._ports_combo = QtWidgets.QComboBox()
+        self._ports_combo.setDuplicatesEnabled(False)
+
+        self._screens_combo = QtWidgets.QComboBox()
+        self._screens_combo.setDuplicatesEnabled(False)
+
+        form_layout = QtWidgets.QFormLayout()
+        form_layout.addRow(_('Port'), self._ports_combo)
+        form_layout.addRow(_('Stimulus screen'), self._screens_combo)
+
+        dialog_buttons = QtWidgets.QDialogButtonBox()
+        self._open_button = dialog_buttons.addButton(_('Open'), QtWidgets.QDialogButtonBox.AcceptRole)
+        dialog_buttons.addButton(_('Cancel'), QtWidgets.QDialogButtonBox.RejectRole)
+        dialog_buttons.accepted.connect(self._on_accepted)
+        dialog_buttons.rejected.connect(self.reject)
+
+        layout = QtWidgets.QVBoxLayout()
+        layout.addLayout(form_layout)
+        layout.addWidget(dialog_buttons)
+        self.setLayout(layout)
+
+    def open(self, taken_ports: Collection[str] = ()):
+        from saccrec.recording import CytonBoard, PortDiscovery
+
+        # Ports of other stations, connected or not, are never offered twice
+        taken = set(taken_ports) | CytonBoard.busy_ports()
+
+        self._ports_combo.clear()
+        for port in PortDiscovery.instance().ports:
+            if port not in taken:
+                self._ports_combo.addItem(port, port)
+
+        self._screens_combo.clear()
+        for index in range(settings.screen.count):
+            self._screens_combo.addItem(f'{index + 1}: {settings.screen.screen_name(index)}', index)
+
+        self._open_button.setEnabled(self._ports_combo.count() > 0)
+
+        super(StationDialog, self).open()
+
+    def _on_accepted(self):
+        self.stationSelected.emit(str(self._ports_combo.currentData()), int(self._screens_combo.currentData()))
+        self.accept()
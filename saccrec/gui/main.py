@@ -1,4 +1,7 @@
 import logging
+from os.path import basename, join
+from tempfile import TemporaryFile
+from typing import Optional
 
 from eoglib.models import Protocol, StimulusPosition, Subject
 from numpy import array, float32
@@ -7,21 +10,27 @@ from PySide6 import QtCore, QtGui, QtWidgets
 from saccrec import settings
 from saccrec.core.formats import create_study
 from saccrec.gui import icons  # noqa: F401
-from saccrec.gui.dialogs import AboutDialog, SDCardImport, SettingsDialog
-from saccrec.gui.widgets import LoggerWidget, SignalsWidget, StimulusPlayer
+from saccrec.gui.dialogs import AboutDialog, SDCardImport, SettingsDialog, StationDialog
+from saccrec.gui.widgets import BoardsWidget, LoggerWidget, SignalsWidget, StimulusPlayer
 from saccrec.gui.wizards import RecordSetupWizard
-from saccrec.recording import CytonBoard
+from saccrec.recording import CytonBoard, PortDiscovery, StreamWriter, run_self_test
 
 logger = logging.getLogger('saccrec')
 logger.setLevel(logging.INFO)
 
+TELEMETRY_INTERVAL = 1000
+
 
 class MainWindow(QtWidgets.QMainWindow):
 
-    def __init__(self):
+    def __init__(self, port: Optional[str] = None, screen: Optional[int] = None):
         QtWidgets.QMainWindow.__init__(self)
 
         # Local State
+        # A window opened with a port of its own is an extra recording station
+        self._port = port
+        self._station = port is not None and screen is not None
+        self._stations: list['MainWindow'] = []
         self._current_test = 0
 
         self._subject: Subject = None
@@ -30,9 +39,15 @@ class MainWindow(QtWidgets.QMainWindow):
         self._light_intensity: int = 0
         self._filename: str = None
         self._studies: list[str] = []
-        self._current_file = None
+        self._stream_writer: Optional[StreamWriter] = None
         self._board = None
         self._last_position = 0
+        self._test_started_at: float = 0.0
+        self._test_parameters: list[dict] = []
+        self._self_test: dict = {}
+
+        # Board discovery runs in background so nothing below blocks on hardware
+        PortDiscovery.instance()
 
         # Setting signals
         self._signals_widget = SignalsWidget()
@@ -43,23 +58,28 @@ class MainWindow(QtWidgets.QMainWindow):
 
         logger.addHandler(self._logger)
 
+        # Setting boards dashboard
+        self._boards_widget = BoardsWidget()
+
         # Related Widgets
         self._new_record_wizard: RecordSetupWizard = None
         self._sd_import_dialog: SDCardImport = None
         self._about_dialog: AboutDialog = None
         self._settings_dialog = SettingsDialog(self)
+        self._station_dialog: StationDialog = None
 
         # Setting Splitter
         self._splitter = QtWidgets.QSplitter()
         self._splitter.setOrientation(QtCore.Qt.Vertical)
         self._splitter.addWidget(self._signals_widget)
+        self._splitter.addWidget(self._boards_widget)
         self._splitter.addWidget(self._logger)
         self._splitter.setCollapsible(0, True)
 
         # Local Widgets
         self.setCentralWidget(self._splitter)
 
-        self._stimulus_player = StimulusPlayer(self, self._on_read_data)
+        self._stimulus_player = StimulusPlayer(self, self._on_read_data, screen)
         self._stimulus_player.aboutToStart.connect(self._on_test_about_to_start)
         self._stimulus_player.started.connect(self._on_test_started)
         self._stimulus_player.stopped.connect(self._on_test_stopped)
@@ -80,13 +100,21 @@ class MainWindow(QtWidgets.QMainWindow):
         self._new_action.triggered.connect(self._on_new_action_clicked)
         self._new_action.setEnabled(False)
 
+        self._station_action = QtGui.QAction(QtGui.QIcon(':/actions/plug.svg'), _('New S&tation'), self)
+        self._station_action.setStatusTip(_('Record from another board on its own stimulus screen'))
+        self._station_action.triggered.connect(self._on_station_action_clicked)
+
         self._import_sd_action = QtGui.QAction(QtGui.QIcon(':/actions/sd-card.svg'), _('&Import SD Data'), self)
         self._import_sd_action.triggered.connect(self._on_import_sd_action_clicked)
 
         self._exit_action = QtGui.QAction(QtGui.QIcon(':/actions/door-open.svg'), _('&Exit'), self)
         self._exit_action.setShortcut('Ctrl+Q')
-        self._exit_action.setStatusTip(_('Exit the app'))
-        self._exit_action.triggered.connect(QtWidgets.QApplication.instance().quit)
+        if self._station:
+            self._exit_action.setStatusTip(_('Close this station'))
+            self._exit_action.triggered.connect(self.close)
+        else:
+            self._exit_action.setStatusTip(_('Exit the app'))
+            self._exit_action.triggered.connect(QtWidgets.QApplication.instance().quit)
 
         self._settings_action = QtGui.QAction(QtGui.QIcon(':/actions/cog.svg'), _('&Settings'), self)
         self._settings_action.setShortcut('Ctrl+P')
@@ -106,6 +134,8 @@ class MainWindow(QtWidgets.QMainWindow):
         # Setting up top menu
         file_menu.addAction(self._new_action)
         file_menu.addAction(self._settings_action)
+        if not self._station:
+            file_menu.addAction(self._station_action)
 
         file_menu.addSeparator()
 
@@ -122,9 +152,17 @@ class MainWindow(QtWidgets.QMainWindow):
         main_toolbar.addSeparator()
         main_toolbar.addAction(self._exit_action)
 
+        # Setting up acquisition telemetry
+        self._telemetry_label = QtWidgets.QLabel()
+        self.statusBar().addPermanentWidget(self._telemetry_label)
+
+        self._telemetry_timer = QtCore.QTimer(self)
+        self._telemetry_timer.timeout.connect(self._on_telemetry_timeout)
+        self._telemetry_timer.start(TELEMETRY_INTERVAL)
+
         # Setting up window
         self.setGeometry(300, 300, 300, 200)
-        self.setWindowTitle('SaccRec')
+        self.setWindowTitle(f'SaccRec - {port}' if self._station else 'SaccRec')
         self.setWindowIcon(QtGui.QIcon(':/brand/app.png'))
 
         self._setup_gui_for_non_recording()
@@ -155,8 +193,26 @@ class MainWindow(QtWidgets.QMainWindow):
     #       Actions Events Handlers
     # ======================================
 
+    @property
+    def port(self) -> str:
+        return self._port or settings.hardware.port
+
     def _on_connect_clicked(self):
-        self._board = CytonBoard.reset(port=settings.hardware.port)
+        # Boards opened by other stations stay connected, only this window's is replaced
+        port = self.port
+        if any(board.port == port and board is not self._board for board in CytonBoard.instances()):
+            QtWidgets.QMessageBox.warning(
+                self,
+                _('Connect'),
+                _('The board on {port} is used by another station').format(port=port)
+            )
+            return
+
+        if self._board is not None and self._board.port != port:
+            self._board.close()
+
+        self._board = CytonBoard.reset(port=port)
+        self._boards_widget.refresh()
 
         # Check for OpenBCI Connection
         if self._board.ready:
@@ -164,6 +220,19 @@ class MainWindow(QtWidgets.QMainWindow):
         else:
             self._new_action.setEnabled(False)
 
+    def _on_station_action_clicked(self):
+        if self._station_dialog is None:
+            self._station_dialog = StationDialog(self)
+            self._station_dialog.stationSelected.connect(self._on_station_selected)
+        self._station_dialog.open([self.port] + [station.port for station in self._stations])
+
+    def _on_station_selected(self, port: str, screen: int):
+        station = MainWindow(port=port, screen=screen)
+        station.setAttribute(QtCore.Qt.WA_DeleteOnClose)
+        station.destroyed.connect(lambda: self._stations.remove(station))
+        self._stations.append(station)
+        station.show()
+
     def _on_new_action_clicked(self):
         if self._new_record_wizard is None:
             self._new_record_wizard = RecordSetupWizard(parent=self)
@@ -201,12 +270,55 @@ class MainWindow(QtWidgets.QMainWindow):
     #        App Flow Event Handlers
     # ======================================
 
+    def _run_self_test(self) -> bool:
+        self._signals_widget.setVisible(True)
+        self._signals_widget.reset_data()
+
+        # Display and storage run for real so the headroom covers the whole pipeline
+        with TemporaryFile() as storage:
+            def consume(batch):
+                self._plot_batch(batch)
+                storage.write(batch.data.tobytes())
+                QtWidgets.QApplication.processEvents()
+
+            report = run_self_test(self._board, consume)
+
+        self._signals_widget.reset_data()
+        self._last_position = 0
+        self._self_test = report.json
+
+        if report.passed:
+            return True
+
+        self._signals_widget.setVisible(False)
+        answer = QtWidgets.QMessageBox.question(
+            self,
+            _('Self-test'),
+            _('The recording pipeline can not keep up at {rate} Hz ({delivery:.1f} % delivered, '
+              '{headroom:.1f} % headroom). Continue anyway?').format(
+                rate=report.sampling_rate,
+                delivery=report.delivery,
+                headroom=report.headroom
+            )
+        )
+        return answer == QtWidgets.QMessageBox.Yes
+
     def _on_wizard_finished(self, record_setup: dict):
+        if self._board.ready and not self._run_self_test():
+            return
+
         if self._board.ready:
             self._filename = self._board.create_sd_file()
 
         if self._board.ready:
-            self._current_file = open(f'/tmp/{self._filename}.dat', 'wb')
+            self._stream_writer = StreamWriter(
+                join(self._records_path('live'), f'{self._filename}.dat'),
+                settings.hardware.sampling_rate,
+                [settings.hardware.horizontal_channel, settings.hardware.vertical_channel],
+                settings.gui.stream_fsync_interval
+            )
+            self._stream_writer.start()
+            self._board.stream_writer = self._stream_writer
 
             self._setup_gui_for_recording()
             self._signals_widget.setVisible(True)
@@ -228,11 +340,16 @@ class MainWindow(QtWidgets.QMainWindow):
 
             # Initialize Recorder
             self._current_test = 0
+            self._test_parameters = []
             stimulus = self._protocol[0]
             saccadic_distance = settings.stimuli.saccadic_distance
             distance_to_subject = self._protocol.distance_to_subject(saccadic_distance)
             self._stimulus_player.start(stimulus, distance_to_subject)
 
+    def _records_path(self, kind: str) -> str:
+        # Every station writes under its own port, SD file names repeat across boards
+        return join(settings.gui.records_path, kind, basename(self._board.port))
+
     def _on_test_about_to_start(self):
         self._signals_widget.reset_data()
 
@@ -240,8 +357,17 @@ class MainWindow(QtWidgets.QMainWindow):
             self._board.marker(StimulusPosition.Center.marker)
 
     def _on_test_started(self, timestamp):
+        self._test_started_at = timestamp
         if self._board.ready:
-            self._board.start()
+            capture_path = None
+            if settings.hardware.raw_capture:
+                capture_path = join(
+                    self._records_path('captures'),
+                    f'{self._filename}-{self._current_test + 1}.raw'
+                )
+            if self._stream_writer is not None:
+                self._stream_writer.begin_test(self._current_test + 1)
+            self._board.start(capture_path=capture_path)
 
     def _on_test_stopped(self):
         self._current_test = 0
@@ -249,10 +375,28 @@ class MainWindow(QtWidgets.QMainWindow):
         self._stimulus_player.stop()
         self._stimulus_player.close()
         self._board.stop()
+        self._close_stream_writer()
+
+    def _close_stream_writer(self):
+        if self._stream_writer is not None:
+            self._board.stream_writer = None
+            self._stream_writer.stop()
+            self._stream_writer = None
 
     def _on_test_finished(self):
         self._current_test += 1
         self._board.stop()
+        if self._stream_writer is not None:
+            self._stream_writer.end_test(self._current_test)
+        self._test_parameters.append({
+            'host_clock': {
+                **self._board.clock.json,
+                'stimulus_started_at': self._test_started_at,
+            },
+            'outages': self._board.outages,
+            'overflows': self._board.overflows,
+            'self_test': self._self_test,
+        })
         self._last_position = 0
         if self._current_test < len(self._protocol):
             stimulus = self._protocol[self._current_test]
@@ -260,9 +404,7 @@ class MainWindow(QtWidgets.QMainWindow):
             distance_to_subject = self._protocol.distance_to_subject(saccadic_distance)
             self._stimulus_player.start(stimulus, distance_to_subject)
         else:
-            if self._current_file is not None:
-                self._current_file.close()
-                self._current_file = None
+            self._close_stream_writer()
 
             if self._board.ready:
                 self._board.close_sd_file()
@@ -277,7 +419,8 @@ class MainWindow(QtWidgets.QMainWindow):
                     protocol=self._protocol,
                     light_intensity=self._light_intensity,
                     output_path=self._output_path,
-                    source_filename=self._filename
+                    source_filename=self._filename,
+                    test_parameters=self._test_parameters
                 ) is not None:
                     self._studies.append(self._output_path)
                     QtWidgets.QMessageBox.information(
@@ -288,15 +431,41 @@ class MainWindow(QtWidgets.QMainWindow):
                         )
                     )
 
+    def _on_telemetry_timeout(self):
+        if self._board is None or not self._board.ready:
+            self._telemetry_label.setText('')
+            return
+
+        telemetry = self._board.telemetry
+        self._telemetry_label.setText(
+            _('{bytes_rate:.0f} B/s | {frames_rate:.0f} frames/s | resyncs {resyncs} | '
+              'sync losses {sync_losses} | invalid positions {invalid_positions} | '
+              'in waiting peak {waiting_peak} B | decode {decode_time:.2f} ms (peak {decode_time_peak:.2f} ms) | '
+              'backlog {backlog}').format(
+                bytes_rate=telemetry.bytes_rate,
+                frames_rate=telemetry.frames_rate,
+                resyncs=telemetry.resyncs,
+                sync_losses=telemetry.sync_losses,
+                invalid_positions=telemetry.invalid_positions,
+                waiting_peak=telemetry.waiting_peak,
+                decode_time=telemetry.decode_time * 1000,
+                decode_time_peak=telemetry.decode_time_peak * 1000,
+                backlog=telemetry.backlog
+            )
+        )
+
     def _on_stimulus_refreshed(self, value: int):
         self._board.marker(StimulusPosition(value).marker)
 
     def _on_read_data(self):
-        horizontal_list, vertical_list, position_list = [], [], []
-        data = self._board.read()
-        for index, horizontal, vertical, position in data:
-            horizontal_list.append(horizontal)
-            vertical_list.append(vertical)
+        if (batch := self._board.samples()) is None:
+            return
+
+        self._plot_batch(batch)
+
+    def _plot_batch(self, batch):
+        position_list = []
+        for position in batch.position:
             self._last_position = {
                 0x01: -1,
                 0x02: 1,
@@ -305,9 +474,23 @@ class MainWindow(QtWidgets.QMainWindow):
 
             position_list.append(self._last_position)
 
-        if horizontal_list:
-            horizontal = array(horizontal_list, dtype=float32)
-            vertical = array(vertical_list, dtype=float32)
-            positions = array(position_list, dtype=float32)
+        horizontal = batch.horizontal.astype(float32)
+        vertical = batch.vertical.astype(float32)
+        positions = array(position_list, dtype=float32)
+
+        self._signals_widget.plot(horizontal, vertical, positions)
+
+    def closeEvent(self, event):
+        if self._stop_action.isEnabled():
+            event.ignore()
+            return
+
+        for station in list(self._stations):
+            station.close()
+
+        if self._board is not None:
+            self._board.close()
+            self._board = None
 
-            self._signals_widget.plot(horizontal, vertical, positions)
+        logger.removeHandler(self._logger)
+        super(MainWindow, self).closeEvent(event)
@@ -1,3 +1,4 @@
+from .boards import BoardsWidget
 from .controls import ColorButton
 from .logger import LoggerWidget
 from .player import StimulusPlayer
@@ -7,6 +8,7 @@ from .stimulus import SaccadicStimulusWidget
 from .subject import SubjectWidget
 
 __all__ = [
+    'BoardsWidget',
     'ColorButton',
     'LoggerWidget',
     'ProtocolWidget',
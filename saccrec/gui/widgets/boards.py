@@ -0,0 +1,47 @@
+from PySide6 import QtCore, QtWidgets
+
+from saccrec.recording import CytonBoard
+
+REFRESH_INTERVAL = 1000
+
+
+class BoardsWidget(QtWidgets.QTableWidget):
+
+    def __init__(self, parent=None):
+        super(BoardsWidget, self).__init__(0, 5, parent=parent)
+
+        self.setHorizontalHeaderLabels([
+            _('Port'),
+            _('Samples/s'),
+            _('Lost'),
+            _('Buffered'),
+            _('CPU'),
+        ])
+        self.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.setSelectionMode(QtWidgets.QAbstractItemView.NoSelection)
+        self.verticalHeader().setVisible(False)
+        self.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Stretch)
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.timeout.connect(self.refresh)
+        self._timer.start(REFRESH_INTERVAL)
+
+        self.refresh()
+
+    def _set_text(self, row: int, column: int, text: str):
+        if (item := self.item(row, column)) is None:
+            item = QtWidgets.QTableWidgetItem()
+            self.setItem(row, column, item)
+        item.setText(text)
+
+    def refresh(self):
+        # Only counters are read here, every board keeps acquiring on its own thread
+        boards = sorted(CytonBoard.instances(), key=lambda board: board.port)
+        self.setRowCount(len(boards))
+
+        for row, board in enumerate(boards):
+            self._set_text(row, 0, board.port)
+            self._set_text(row, 1, f'{board.throughput:.1f}')
+            self._set_text(row, 2, str(board.lost_samples))
+            self._set_text(row, 3, str(board.buffered_samples))
+            self._set_text(row, 4, f'{board.cpu_usage * 100:.1f} %')
@@ -1,9 +1,10 @@
 from logging import Handler, INFO, ERROR, WARN, DEBUG
 
-from PySide6 import QtWidgets
+from PySide6 import QtCore, QtWidgets
 
 
 class LoggerWidget(Handler, QtWidgets.QPlainTextEdit):
+    _appended = QtCore.Signal(str)
 
     def __init__(self, parent=None):
         QtWidgets.QPlainTextEdit.__init__(self, parent)
@@ -11,6 +12,10 @@ class LoggerWidget(Handler, QtWidgets.QPlainTextEdit):
 
         self.setReadOnly(True)
 
+        # Records may come from the acquisition threads, so the widget is only
+        # touched from the GUI thread through a queued signal
+        self._appended.connect(self._on_appended, QtCore.Qt.QueuedConnection)
+
     def emit(self, record):
         msg = self.format(record)
 
@@ -24,9 +29,12 @@ class LoggerWidget(Handler, QtWidgets.QPlainTextEdit):
         elif record.levelno == WARN:
             fmt = '<span style="color: yellow">{msg}</span><br>'
 
+        self._appended.emit(fmt.format(msg=msg))
+
+    def _on_appended(self, html: str):
         try:
-            self.textCursor().insertHtml(fmt.format(msg=msg))
+            self.textCursor().insertHtml(html)
             self.repaint()
         except ValueError as error:
-            print(f'ValueError: {msg}')
+            print(f'ValueError: {html}')
             print(error)
@@ -1,6 +1,7 @@
 import logging
 from math import ceil, floor, tan, radians
-from time import time
+from time import monotonic
+from typing import Optional
 
 from PySide6 import QtCore, QtGui, QtWidgets
 
@@ -19,10 +20,11 @@ class StimulusPlayer(QtWidgets.QWidget):
     finished = QtCore.Signal()
     refreshed = QtCore.Signal(int)
 
-    def __init__(self, parent=None, read_function: callable = None):
+    def __init__(self, parent=None, read_function: callable = None, screen: Optional[int] = None):
         super(StimulusPlayer, self).__init__()
 
         self._parent = parent
+        self._screen = screen
 
         self._timeout = 0
 
@@ -45,9 +47,22 @@ class StimulusPlayer(QtWidgets.QWidget):
         self._ball_position = None
         self._distance_to_subject = None
 
+    @property
+    def _screen_rect(self) -> QtCore.QRect:
+        # Without a screen of its own the player takes the secondary one
+        if self._screen is None:
+            return settings.screen.secondary_screen_rect
+        return settings.screen.screen_rect(self._screen)
+
+    @property
+    def _screen_refresh_rate(self) -> float:
+        if self._screen is None:
+            return settings.screen.secondary_screen_refresh_rate
+        return settings.screen.screen_refresh_rate(self._screen)
+
     def _load_settings(self):
         # Timer interval computing based on refresh rate
-        timeout = floor(1000.0 / settings.screen.secondary_screen_refresh_rate)
+        timeout = floor(1000.0 / self._screen_refresh_rate)
         if timeout != self._timeout:
             self._timeout = timeout
             self._timer.setInterval(timeout)
@@ -61,13 +76,13 @@ class StimulusPlayer(QtWidgets.QWidget):
 
         cm_width = settings.stimuli.screen_width
         cm_center, cm_delta = cm_width / 2, distance / 2
-        self._cm_to_pixels_x = settings.screen.secondary_screen_rect.width() / cm_width
+        self._cm_to_pixels_x = self._screen_rect.width() / cm_width
 
         left_x = (cm_center - cm_delta) * self._cm_to_pixels_x
         right_x = (cm_center + cm_delta) * self._cm_to_pixels_x
         center_x = (left_x + right_x) / 2
 
-        y = settings.screen.secondary_screen_rect.center().y()
+        y = self._screen_rect.center().y()
 
         self._left_ball = QtCore.QPoint(left_x, y)
         self._center_ball = QtCore.QPoint(center_x, y)
@@ -104,8 +119,8 @@ class StimulusPlayer(QtWidgets.QWidget):
         ])
 
         self.move(
-            settings.screen.secondary_screen_rect.left(),
-            settings.screen.secondary_screen_rect.top()
+            self._screen_rect.left(),
+            self._screen_rect.top()
         )
         self.showFullScreen()
         self.repaint()
@@ -123,7 +138,7 @@ class StimulusPlayer(QtWidgets.QWidget):
         self._message = None
         self._ball_position, _ = self._screen_position(0)
         self.repaint()
-        self._start_time = time()
+        self._start_time = monotonic()
         self._timer.start()
         self.started.emit(self._start_time)
 
@@ -134,7 +149,7 @@ class StimulusPlayer(QtWidgets.QWidget):
         self._ball_position = None
 
     def _on_timeout(self):
-        elapsed = (time() - self._start_time) * 1000.0
+        elapsed = (monotonic() - self._start_time) * 1000.0
         current_sample = ceil(elapsed / self._sampling_step)
 
         previous_position = self._ball_position
@@ -1,6 +1,6 @@
 from math import log10
 
-from numpy import arange, array, float32, hstack, int32, ones, zeros
+from numpy import arange, array, float32, hstack, int32, nanmean, nanstd, ones, zeros
 from pyqtgraph import PlotCurveItem, PlotWidget, setConfigOption
 from PySide6 import QtGui, QtWidgets
 
@@ -72,8 +72,8 @@ class SignalsWidget(QtWidgets.QWidget):
             return
 
         if self._horizontal.size > 0 and self._first:
-            self._horizontal = self._horizontal * horizontal.mean()
-            self._vertical = self._vertical * vertical.mean()
+            self._horizontal = self._horizontal * nanmean(horizontal)
+            self._vertical = self._vertical * nanmean(vertical)
             self._first = False
 
         time = (arange(1, len(horizontal) + 1, dtype=int32) * SAMPLING_STEP) + self._time[-1]
@@ -83,14 +83,14 @@ class SignalsWidget(QtWidgets.QWidget):
         self._vertical = hstack((self._vertical, vertical))[-WINDOW_LENGTH:]
         self._positions = hstack((self._positions, positions))[-WINDOW_LENGTH:]
 
-        horizontal_mean, horizontal_std = self._horizontal.mean(), self._horizontal.std()
+        horizontal_mean, horizontal_std = nanmean(self._horizontal), nanstd(self._horizontal)
 
         try:
             horizontal_scale = 10 ** log10(horizontal_std * 2)
         except ValueError:
             horizontal_scale = 1
 
-        vertical_mean, vertical_std = self._vertical.mean(), self._vertical.std()
+        vertical_mean, vertical_std = nanmean(self._vertical), nanstd(self._vertical)
         self._vertical -= vertical_mean
 
         try:
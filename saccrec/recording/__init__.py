@@ -1,5 +1,30 @@
+from .acquisition import AcquisitionWorker
+from .aio import AsyncBoardBridge, AsyncCytonBoard
+from .buffer import SampleBatch, SampleRingBuffer
+from .capture import CaptureReplay, CaptureWriter
+from .clock import ClockModel
+from .discovery import PortDiscovery
+from .markers import MarkerWriter
 from .openeog import CytonBoard
+from .selftest import SelfTestReport, run_self_test
+from .stream import StreamWriter, read_stream
+from .telemetry import TelemetrySnapshot
 
 __all__ = [
+    'AcquisitionWorker',
+    'AsyncBoardBridge',
+    'AsyncCytonBoard',
+    'CaptureReplay',
+    'CaptureWriter',
+    'ClockModel',
     'CytonBoard',
+    'MarkerWriter',
+    'PortDiscovery',
+    'SampleBatch',
+    'SampleRingBuffer',
+    'SelfTestReport',
+    'StreamWriter',
+    'TelemetrySnapshot',
+    'read_stream',
+    'run_self_test',
 ]
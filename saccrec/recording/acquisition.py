@@ -0,0 +1,112 @@
+import logging
+from threading import Event, Thread
+from time import monotonic, sleep, thread_time
+from typing import Callable, Optional
+
+from serial import SerialException
+
+from .buffer import SampleBatch, SampleRingBuffer
+
+logger = logging.getLogger('saccrec')
+
+IDLE_WAIT = 0.001
+CPU_WINDOW = 1.0
+
+
+class AcquisitionWorker(Thread):
+
+    def __init__(
+        self,
+        port: str,
+        read_function: Callable[[], Optional[SampleBatch]],
+        buffer: SampleRingBuffer,
+        idle_wait: float = IDLE_WAIT,
+        wait_function: Optional[Callable[[float], bool]] = None,
+        recover_function: Optional[Callable[[Optional[Exception]], bool]] = None,
+        stall_timeout: Optional[float] = None
+    ):
+        super(AcquisitionWorker, self).__init__(name=f'saccrec-acquisition-{port}', daemon=True)
+
+        self._read_function = read_function
+        self._buffer = buffer
+        self._idle_wait = idle_wait
+        self._wait_function = wait_function
+        self._recover_function = recover_function
+        self._stall_timeout = stall_timeout
+
+        self._running = Event()
+        self._error: Optional[Exception] = None
+        self._cpu_usage = 0.0
+
+    @property
+    def buffer(self) -> SampleRingBuffer:
+        return self._buffer
+
+    @property
+    def running(self) -> bool:
+        return self._running.is_set()
+
+    @property
+    def error(self) -> Optional[Exception]:
+        return self._error
+
+    @property
+    def cpu_usage(self) -> float:
+        return self._cpu_usage
+
+    def start(self):
+        self._running.set()
+        super(AcquisitionWorker, self).start()
+
+    def _recover(self, error: Optional[Exception]) -> bool:
+        if self._recover_function is None or not self._running.is_set():
+            return False
+        return self._recover_function(error)
+
+    def _fail(self, error: Exception):
+        self._error = error
+        self._running.clear()
+        logger.error(f'Acquisition stopped: {error}')
+
+    def stop(self, timeout: float = 1.0) -> bool:
+        self._running.clear()
+        if self.is_alive():
+            self.join(timeout)
+        return not self.is_alive()
+
+    def run(self):
+        cpu_start, wall_start = thread_time(), monotonic()
+        last_data = wall_start
+
+        while self._running.is_set():
+            try:
+                batch = self._read_function()
+                if batch is not None and batch.size > 0:
+                    self._buffer.push(batch)
+                    last_data = monotonic()
+                elif self._stall_timeout is not None and monotonic() - last_data > self._stall_timeout:
+                    if not self._recover(None):
+                        self._running.clear()
+                        logger.error(f'Acquisition stopped: no data for {self._stall_timeout:.3f} s')
+                        break
+                    last_data = monotonic()
+                elif self._wait_function is not None:
+                    self._wait_function(self._idle_wait)
+                else:
+                    sleep(self._idle_wait)
+            except (SerialException, OSError) as error:
+                if self._recover(error):
+                    last_data = monotonic()
+                    continue
+
+                self._fail(error)
+                break
+            except Exception as error:
+                # Not a link fault (e.g. the backlog policy), reconnecting would not help
+                self._fail(error)
+                break
+
+            if (now := monotonic()) - wall_start >= CPU_WINDOW:
+                cpu = thread_time()
+                self._cpu_usage = (cpu - cpu_start) / (now - wall_start)
+                cpu_start, wall_start = cpu, now
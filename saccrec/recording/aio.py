@@ -0,0 +1,222 @@
+import asyncio
+import logging
+import re
+from concurrent.futures import Future
+from threading import Thread
+from typing import AsyncIterator, Coroutine, Optional
+
+from PySide6 import QtCore
+from serial import Serial
+
+from saccrec.settings import hardware as conf
+
+from .buffer import SampleBatch
+from .openeog import BAUD_RATE, COMMAND_TIMEOUT, TERMINATOR, CommandTimeoutError, parse_response, split_response
+from .receiver import ReceiveBuffer
+from .sequence import SequenceTracker
+
+logger = logging.getLogger('saccrec')
+
+
+class AsyncCytonBoard:
+
+    def __init__(self, port: str):
+        self._port = port
+        self._ready = False
+        self._recording = False
+        self._sd_open = False
+
+        self._serial: Optional[Serial] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self._buffer = ReceiveBuffer()
+        self._sequence = SequenceTracker(conf.fill_policy, conf.sampling_rate)
+        self._batches: asyncio.Queue = None
+
+        self._response = bytearray()
+        self._response_count = 0
+        self._response_future: Optional[asyncio.Future] = None
+
+    @property
+    def port(self) -> str:
+        return self._port
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    @property
+    def recording(self) -> bool:
+        return self._recording
+
+    async def open(self):
+        logger.info('Initializing Cyton Board')
+
+        self._loop = asyncio.get_running_loop()
+        self._batches = asyncio.Queue()
+        self._serial = Serial(port=self._port, baudrate=BAUD_RATE, timeout=0, exclusive=True)
+        self._loop.add_reader(self._serial.fileno(), self._on_readable)
+        self._ready = True
+
+        try:
+            await self.command('v', timeout=1)
+
+            commands = [conf.eog_channels_command]
+            if conf.sampling_rate_command is not None:
+                commands.insert(0, conf.sampling_rate_command)
+            for channel in conf.channels:
+                if channel.active:
+                    commands.append(channel.settings_command)
+
+            for response in await self.command_batch(commands):
+                if 'too few chars' in response:
+                    self._ready = False
+        except CommandTimeoutError as error:
+            self._ready = False
+            logger.error(str(error))
+
+    async def close(self):
+        if self._recording:
+            await self.stop()
+
+        if self._sd_open:
+            await self.close_sd_file()
+
+        if self._serial is not None:
+            self._loop.remove_reader(self._serial.fileno())
+            self._serial.close()
+            self._serial = None
+
+        logger.info('Closing Cyton Board')
+
+    def _on_readable(self):
+        if self._response_future is not None and not self._response_future.done():
+            self._response += self._serial.read(self._serial.in_waiting)
+            if self._response.count(TERMINATOR) >= self._response_count:
+                response, rest = split_response(bytes(self._response), self._response_count)
+                self._buffer.feed(rest)
+                self._response_future.set_result(response)
+            return
+
+        if self._buffer.fill(self._serial) == 0:
+            return
+
+        if self._recording:
+            if (batch := self._sequence.process(self._buffer.decode(), self._loop.time())).size > 0:
+                self._batches.put_nowait(batch)
+        else:
+            self._buffer.clear()
+
+    async def _request(self, payload: str, label: str, count: int, timeout: float) -> bytes:
+        self._response = bytearray()
+        self._response_count = count
+        self._response_future = self._loop.create_future()
+
+        self._serial.write(payload.encode('ASCII'))
+        try:
+            return await asyncio.wait_for(self._response_future, timeout)
+        except asyncio.TimeoutError:
+            raise CommandTimeoutError(
+                f'No response to <strong>[{label}]</strong> after {timeout:.1f} s'
+            )
+        finally:
+            self._response_future = None
+
+    def _parse(self, cmd: str, msg: bytes) -> str:
+        decoded_message, ok = parse_response(cmd, msg)
+        if not ok:
+            self._ready = False
+        return decoded_message
+
+    async def command(self, cmd: str, timeout: float = COMMAND_TIMEOUT) -> str:
+        return self._parse(cmd, await self._request(cmd, cmd, 1, timeout))
+
+    async def command_batch(self, commands: list[str], timeout: float = COMMAND_TIMEOUT) -> list[str]:
+        msg = await self._request(''.join(commands), ' '.join(commands), len(commands), timeout * len(commands))
+        return [
+            self._parse(cmd, response + TERMINATOR)
+            for cmd, response in zip(commands, msg.split(TERMINATOR))
+        ]
+
+    def marker(self, label: str):
+        self._serial.write(f'O{label}'.encode('ASCII'))
+
+    async def create_sd_file(self) -> Optional[str]:
+        try:
+            msg = await self.command('S', timeout=2)
+        except CommandTimeoutError as error:
+            logger.error(str(error))
+            self._ready = False
+            return None
+
+        if (match := re.search('[0-9A-F]{6}.EOG', msg)) is None:
+            self._ready = False
+            return None
+
+        self._sd_open = True
+        return match[0]
+
+    async def close_sd_file(self):
+        try:
+            await self.command('j', timeout=2)
+        except CommandTimeoutError as error:
+            logger.error(str(error))
+        self._sd_open = False
+        logger.info('SD File Closed')
+
+    async def start(self):
+        self._buffer.clear()
+        self._sequence.reset()
+        self._serial.reset_input_buffer()
+        # Set first, the frames behind the response must not be cleared
+        self._recording = True
+        try:
+            await self.command('(', timeout=2)
+        except CommandTimeoutError:
+            pass
+
+    async def stop(self):
+        self._recording = False
+        try:
+            await self.command(')', timeout=1)
+        except CommandTimeoutError as error:
+            logger.warning(str(error))
+        self._serial.reset_input_buffer()
+        self._buffer.clear()
+        self._batches.put_nowait(None)
+
+    async def batches(self) -> AsyncIterator[SampleBatch]:
+        while (batch := await self._batches.get()) is not None:
+            yield batch
+
+
+class AsyncBoardBridge(QtCore.QObject):
+    batchReady = QtCore.Signal(object)
+
+    # Runs an asyncio loop on its own thread next to the Qt event loop; decoded
+    # batches reach the GUI thread through a queued signal
+
+    def __init__(self, parent=None):
+        super(AsyncBoardBridge, self).__init__(parent)
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = Thread(target=self._loop.run_forever, name='saccrec-asyncio', daemon=True)
+        self._thread.start()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return self._loop
+
+    def submit(self, coroutine: Coroutine) -> Future:
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    def stream(self, board: AsyncCytonBoard) -> Future:
+        async def _forward():
+            async for batch in board.batches():
+                self.batchReady.emit(batch)
+
+        return self.submit(_forward())
+
+    def shutdown(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
@@ -0,0 +1,146 @@
+from threading import Lock
+from typing import NamedTuple, Optional
+
+from numpy import concatenate, empty, float32, ndarray, uint8, uint16
+
+
+class SampleBatch(NamedTuple):
+    index: ndarray
+    data: ndarray
+    position: ndarray
+
+    @property
+    def size(self) -> int:
+        return len(self.index)
+
+    @property
+    def horizontal(self) -> ndarray:
+        return self.data[:, 0]
+
+    @property
+    def vertical(self) -> ndarray:
+        return self.data[:, 1]
+
+
+def concatenate_batches(batches: list[SampleBatch]) -> SampleBatch:
+    if len(batches) == 1:
+        return batches[0]
+
+    return SampleBatch(
+        index=concatenate([batch.index for batch in batches]),
+        data=concatenate([batch.data for batch in batches]),
+        position=concatenate([batch.position for batch in batches])
+    )
+
+
+class SampleRingBuffer:
+
+    # Single producer (acquisition worker) / single consumer (GUI) ring. When
+    # it is full the oldest samples are overwritten, so the producer may move
+    # the read counter too and both sides take the lock.
+
+    def __init__(self, capacity: int, channels: int = 2):
+        self._capacity = capacity
+        self._channels = channels
+
+        self._index = empty(capacity, dtype=uint16)
+        self._data = empty((capacity, channels), dtype=float32)
+        self._position = empty(capacity, dtype=uint8)
+
+        self._written = 0
+        self._read = 0
+        self._overruns = 0
+        self._lock = Lock()
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def channels(self) -> int:
+        return self._channels
+
+    @property
+    def overruns(self) -> int:
+        return self._overruns
+
+    def __len__(self) -> int:
+        return self._written - self._read
+
+    def _store(self, start: int, stop: int, batch: SampleBatch, offset: int):
+        count = stop - start
+        self._index[start:stop] = batch.index[offset:offset + count]
+        self._data[start:stop] = batch.data[offset:offset + count]
+        self._position[start:stop] = batch.position[offset:offset + count]
+
+    def push(self, batch: SampleBatch) -> int:
+        count = batch.size
+        offset = 0
+        if count > self._capacity:
+            offset = count - self._capacity
+            count = self._capacity
+
+        if count == 0:
+            return 0
+
+        with self._lock:
+            self._overruns += offset
+            if (excess := self._written - self._read + count - self._capacity) > 0:
+                self._overruns += excess
+                self._read += excess
+
+            start = self._written % self._capacity
+            first = min(count, self._capacity - start)
+            self._store(start, start + first, batch, offset)
+            if first < count:
+                self._store(0, count - first, batch, offset + first)
+
+            self._written += count
+
+        return count
+
+    def discard(self, count: int) -> int:
+        with self._lock:
+            count = min(count, self._written - self._read)
+            self._read += count
+        return count
+
+    def pop(self, max_count: Optional[int] = None) -> Optional[SampleBatch]:
+        with self._lock:
+            count = self._written - self._read
+            if max_count is not None:
+                count = min(count, max_count)
+
+            if count == 0:
+                return None
+
+            start = self._read % self._capacity
+            stop = start + count
+            if stop <= self._capacity:
+                batch = SampleBatch(
+                    index=self._index[start:stop].copy(),
+                    data=self._data[start:stop].copy(),
+                    position=self._position[start:stop].copy()
+                )
+            else:
+                stop -= self._capacity
+                batch = SampleBatch(
+                    index=self._concat(self._index, start, stop),
+                    data=self._concat(self._data, start, stop),
+                    position=self._concat(self._position, start, stop)
+                )
+
+            self._read += count
+        return batch
+
+    @staticmethod
+    def _concat(column: ndarray, start: int, stop: int) -> ndarray:
+        tail = len(column) - start
+        result = empty((tail + stop, ) + column.shape[1:], dtype=column.dtype)
+        result[:tail] = column[start:]
+        result[tail:] = column[:stop]
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._read = self._written
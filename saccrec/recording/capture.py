@@ -0,0 +1,217 @@
+from argparse import ArgumentParser
+from os import makedirs
+from os.path import dirname
+from struct import Struct
+from time import monotonic_ns, perf_counter, sleep
+from typing import BinaryIO, Iterator, Optional
+
+from saccrec.core.enums import FillPolicy
+
+from .buffer import SampleBatch
+from .decoder import EOG_CHANNELS
+from .receiver import ReceiveBuffer
+from .sequence import SequenceTracker
+
+CAPTURE_MAGIC = b'SACCRAW1'
+# Magic, streamed channels and nominal sampling rate
+CAPTURE_HEADER = Struct('<8sHI')
+# Host monotonic time (ns) of the read and number of bytes that follow
+CHUNK_HEADER = Struct('<QI')
+CAPTURE_BUFFERING = 1 << 20
+
+
+class CaptureFormatError(IOError):
+    pass
+
+
+class CaptureWriter:
+
+    # Tee of every chunk read from the port, written from the acquisition
+    # worker. The large file buffer keeps the write syscalls rare.
+
+    def __init__(self, path: str, channels: int = EOG_CHANNELS, sampling_rate: int = 0):
+        if directory := dirname(path):
+            makedirs(directory, exist_ok=True)
+
+        self._path = path
+        self._file: Optional[BinaryIO] = open(path, 'wb', buffering=CAPTURE_BUFFERING)
+        self._file.write(CAPTURE_HEADER.pack(CAPTURE_MAGIC, channels, sampling_rate))
+
+        self._chunks = 0
+        self._bytes = 0
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def chunks(self) -> int:
+        return self._chunks
+
+    @property
+    def bytes(self) -> int:
+        return self._bytes
+
+    def write(self, data: memoryview, host_ns: Optional[int] = None):
+        if self._file is None or len(data) == 0:
+            return
+
+        self._file.write(CHUNK_HEADER.pack(host_ns if host_ns is not None else monotonic_ns(), len(data)))
+        self._file.write(data)
+        self._chunks += 1
+        self._bytes += len(data)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class CaptureReader:
+
+    def __init__(self, path: str):
+        self._path = path
+        with open(path, 'rb') as f:
+            header = f.read(CAPTURE_HEADER.size)
+
+        if len(header) < CAPTURE_HEADER.size:
+            raise CaptureFormatError(f'{path} is not a raw capture')
+
+        magic, self._channels, self._sampling_rate = CAPTURE_HEADER.unpack(header)
+        if magic != CAPTURE_MAGIC:
+            raise CaptureFormatError(f'{path} is not a raw capture')
+
+    @property
+    def channels(self) -> int:
+        return self._channels
+
+    @property
+    def sampling_rate(self) -> int:
+        return self._sampling_rate
+
+    def __iter__(self) -> Iterator[tuple[int, bytes]]:
+        with open(self._path, 'rb') as f:
+            f.seek(CAPTURE_HEADER.size)
+            while len(header := f.read(CHUNK_HEADER.size)) == CHUNK_HEADER.size:
+                host_ns, size = CHUNK_HEADER.unpack(header)
+                if len(data := f.read(size)) < size:
+                    break
+                yield host_ns, data
+
+
+class ReplaySerial:
+
+    # Serial look-alike feeding captured chunks to ReceiveBuffer.fill(), as
+    # fast as possible or paced by the captured host timestamps
+
+    def __init__(self, reader: CaptureReader, realtime: bool = False):
+        self._chunks = iter(reader)
+        self._realtime = realtime
+        self._pending = b''
+        self._host_ns = 0
+        self._due_ns = 0
+        self._offset_ns: Optional[int] = None
+        self._exhausted = False
+        self._next()
+
+    @property
+    def exhausted(self) -> bool:
+        return self._exhausted and not self._pending
+
+    def _next(self):
+        try:
+            self._host_ns, self._pending = next(self._chunks)
+        except StopIteration:
+            self._pending = b''
+            self._exhausted = True
+            return
+
+        if self._offset_ns is None:
+            self._offset_ns = monotonic_ns() - self._host_ns
+        self._due_ns = self._host_ns + self._offset_ns
+
+    @property
+    def host_time(self) -> float:
+        # Captured host time of the pending chunk
+        return self._host_ns / 1e9
+
+    @property
+    def in_waiting(self) -> int:
+        if self._realtime and monotonic_ns() < self._due_ns:
+            return 0
+        return len(self._pending)
+
+    def readinto(self, buffer: memoryview) -> int:
+        count = min(len(buffer), self.in_waiting)
+        buffer[:count] = self._pending[:count]
+        self._pending = self._pending[count:]
+        if not self._pending:
+            self._next()
+        return count
+
+    def wait(self):
+        if self._realtime and (delay := self._due_ns - monotonic_ns()) > 0:
+            sleep(delay / 1e9)
+
+
+class CaptureReplay:
+
+    def __init__(self, path: str, realtime: bool = False, fill_policy: FillPolicy = FillPolicy.Linear):
+        self._reader = CaptureReader(path)
+        self._serial = ReplaySerial(self._reader, realtime)
+        self._buffer = ReceiveBuffer(channels=self._reader.channels)
+        self._sequence = SequenceTracker(fill_policy, self._reader.sampling_rate or None)
+
+    @property
+    def channels(self) -> int:
+        return self._reader.channels
+
+    @property
+    def sampling_rate(self) -> int:
+        return self._reader.sampling_rate
+
+    @property
+    def buffer(self) -> ReceiveBuffer:
+        return self._buffer
+
+    @property
+    def sequence(self) -> SequenceTracker:
+        return self._sequence
+
+    def __iter__(self) -> Iterator[SampleBatch]:
+        while not self._serial.exhausted:
+            self._serial.wait()
+            host_time = self._serial.host_time
+            self._buffer.fill(self._serial)
+            if (batch := self._sequence.process(self._buffer.decode(), host_time)).size > 0:
+                yield batch
+
+
+def main():
+    parser = ArgumentParser(description='Replay a raw serial capture through the decoder')
+    parser.add_argument('path')
+    parser.add_argument('--realtime', action='store_true')
+    args = parser.parse_args()
+
+    replay = CaptureReplay(args.path, realtime=args.realtime)
+
+    samples = 0
+    started = perf_counter()
+    for batch in replay:
+        samples += batch.size
+    elapsed = perf_counter() - started
+
+    print(f'Channels:          {replay.channels}')
+    print(f'Sampling rate:     {replay.sampling_rate} Hz')
+    print(f'Bytes:             {replay.buffer.received}')
+    print(f'Samples:           {samples}')
+    print(f'Lost samples:      {replay.sequence.lost} in {replay.sequence.gaps} gaps')
+    print(f'Duplicates:        {replay.sequence.duplicates}')
+    print(f'Resyncs:           {replay.buffer.resyncs}')
+    print(f'Sync losses:       {replay.buffer.sync_losses}')
+    print(f'Invalid positions: {replay.buffer.invalid_positions}')
+    print(f'Decode rate:       {samples / elapsed if elapsed > 0 else 0:.0f} samples/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+from typing import NamedTuple, Optional
+
+from numpy import array, asarray, float64, maximum, ndarray, searchsorted
+
+
+class ClockSegment(NamedTuple):
+    start: int
+    offset: float
+    period: float
+    points: int
+
+
+class ClockModel:
+
+    # Online least squares fit of host monotonic time (s) against the board
+    # sample number. Sums are kept relative to the first point so they stay
+    # well conditioned over long protocols.
+
+    # An outage breaks the sample grid, so split() closes the current fit and
+    # starts a new one: every segment maps its own run of samples.
+
+    def __init__(self, sampling_rate: int):
+        self._nominal_period = 1.0 / sampling_rate
+        self.reset()
+
+    def reset(self):
+        self._segments: list[ClockSegment] = []
+        self._start = 0
+        self._restart()
+
+    def _restart(self):
+        self._x0: Optional[int] = None
+        self._y0: Optional[int] = None
+
+        self._n = 0
+        self._sx = 0.0
+        self._sy = 0.0
+        self._sxx = 0.0
+        self._sxy = 0.0
+
+    @property
+    def points(self) -> int:
+        return self._n + sum(segment.points for segment in self._segments)
+
+    def update(self, sample: int, host_ns: int):
+        if self._x0 is None:
+            self._x0, self._y0 = sample, host_ns
+
+        x = float(sample - self._x0)
+        y = (host_ns - self._y0) / 1e9
+
+        self._n += 1
+        self._sx += x
+        self._sy += y
+        self._sxx += x * x
+        self._sxy += x * y
+
+    def split(self, sample: int):
+        if self._n > 0:
+            self._segments.append(ClockSegment(self._start, self.offset, self.period, self._n))
+        self._start = sample
+        self._restart()
+
+    @property
+    def period(self) -> float:
+        denominator = self._n * self._sxx - self._sx * self._sx
+        if self._n < 2 or denominator <= 0:
+            return self._segments[-1].period if self._segments else self._nominal_period
+        return (self._n * self._sxy - self._sx * self._sy) / denominator
+
+    @property
+    def offset(self) -> float:
+        if self._n == 0:
+            return self._segments[-1].offset if self._segments else 0.0
+
+        period = self.period
+        intercept = (self._sy - period * self._sx) / self._n
+        return self._y0 / 1e9 + intercept - period * self._x0
+
+    @property
+    def drift(self) -> float:
+        return self.period / self._nominal_period - 1.0
+
+    @property
+    def segments(self) -> list[ClockSegment]:
+        current = ClockSegment(self._start, self.offset, self.period, self._n)
+        if self._n == 0 and self._segments:
+            return list(self._segments)
+        return self._segments + [current]
+
+    def sample_to_host_time(self, samples: ndarray) -> ndarray:
+        samples = asarray(samples, dtype=float64)
+        if not self._segments:
+            return self.offset + self.period * samples
+
+        segments = self.segments
+        starts = array([segment.start for segment in segments])
+        offsets = array([segment.offset for segment in segments])
+        periods = array([segment.period for segment in segments])
+
+        which = maximum(searchsorted(starts, samples, side='right') - 1, 0)
+        return offsets[which] + periods[which] * samples
+
+    @property
+    def json(self) -> dict:
+        return {
+            'offset': self.offset,
+            'period': self.period,
+            'drift': self.drift,
+            'points': self.points,
+            'segments': [segment._asdict() for segment in self.segments],
+        }
@@ -0,0 +1,65 @@
+from functools import lru_cache
+
+from numpy import dtype, frombuffer, int32, ndarray, uint8, uint16, zeros
+
+from .buffer import SampleBatch
+
+POSITION_CODES = (0x01, 0x02, 0x04, 0x08, 0x10)
+
+# Lookup table indexed by the position byte, much cheaper than isin() on the
+# small batches a live stream produces
+VALID_POSITIONS = zeros(256, dtype=bool)
+VALID_POSITIONS[list(POSITION_CODES)] = True
+
+EOG_CHANNELS = 2
+
+
+@lru_cache
+def frame_dtype(channels: int = EOG_CHANNELS) -> dtype:
+    # Header, sequence number, one 24-bit sample per streamed channel and the
+    # stimulus position code: 4 + 3 * channels bytes
+    return dtype([
+        ('header', uint8),
+        ('index', '>u2'),
+        ('samples', uint8, (channels, 3)),
+        ('position', uint8),
+    ])
+
+
+def frame_size(channels: int = EOG_CHANNELS) -> int:
+    return frame_dtype(channels).itemsize
+
+
+FRAME_DTYPE = frame_dtype()
+
+FRAME_SIZE = FRAME_DTYPE.itemsize
+
+
+def widen_int24(column: ndarray) -> ndarray:
+    result = column[..., 0].astype(int32) << 16
+    result |= column[..., 1].astype(int32) << 8
+    result |= column[..., 2]
+    return result
+
+
+def valid_frames(frames: ndarray) -> ndarray:
+    return (frames['header'] == 0) & VALID_POSITIONS[frames['position']]
+
+
+def valid_prefix(buffer: bytes, channels: int = EOG_CHANNELS) -> int:
+    count = len(buffer) // frame_size(channels)
+    frames = frombuffer(buffer, dtype=frame_dtype(channels), count=count)
+    invalid = (~valid_frames(frames)).nonzero()[0]
+    return int(invalid[0]) if len(invalid) else count
+
+
+def decode_frames(buffer: bytes, channels: int = EOG_CHANNELS) -> SampleBatch:
+    count = len(buffer) // frame_size(channels)
+    frames = frombuffer(buffer, dtype=frame_dtype(channels), count=count)
+    frames = frames[valid_frames(frames)]
+
+    return SampleBatch(
+        index=frames['index'].astype(uint16),
+        data=widen_int24(frames['samples']).reshape(len(frames), channels),
+        position=frames['position'].copy()
+    )
@@ -0,0 +1,84 @@
+from threading import Event, Lock, Thread
+from typing import Optional
+
+from PySide6 import QtCore
+from serial.tools.list_ports import comports
+
+from .openeog import CytonBoard
+
+DISCOVERY_INTERVAL = 2.0
+
+
+class PortDiscovery(QtCore.QObject):
+    portsChanged = QtCore.Signal(list)
+
+    _instance: Optional['PortDiscovery'] = None
+
+    @classmethod
+    def instance(cls) -> 'PortDiscovery':
+        if cls._instance is None:
+            cls._instance = PortDiscovery()
+            cls._instance.start()
+        return cls._instance
+
+    def __init__(self, interval: float = DISCOVERY_INTERVAL, parent=None):
+        super(PortDiscovery, self).__init__(parent)
+
+        self._interval = interval
+        self._ports: list[str] = []
+        self._lock = Lock()
+
+        self._devices: Optional[set[str]] = None
+        self._wake = Event()
+        self._stopped = Event()
+        self._thread: Optional[Thread] = None
+
+    @property
+    def ports(self) -> list[str]:
+        with self._lock:
+            return list(self._ports)
+
+    def start(self):
+        if self._thread is not None:
+            return
+
+        self._stopped.clear()
+        self._thread = Thread(target=self._run, name='saccrec-discovery', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def refresh(self):
+        self._devices = None
+        self._wake.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            # Listing comports only reads sysfs, so polling it is cheap enough to
+            # notice hot-plugged dongles without probing anything
+            devices = {port.device for port in comports()}
+            if devices != self._devices:
+                self._devices = devices
+                self._update(devices)
+
+            self._wake.wait(self._interval)
+            self._wake.clear()
+
+    def _update(self, devices: set[str]):
+        # Never write to a port that is streaming or being opened / recovered
+        busy = CytonBoard.busy_ports()
+
+        ports = set(CytonBoard.iter_ports(exclude=busy))
+        with self._lock:
+            ports.update(port for port in self._ports if port in busy and port in devices)
+            ports = sorted(ports)
+            changed = ports != self._ports
+            self._ports = ports
+
+        if changed:
+            self.portsChanged.emit(ports)
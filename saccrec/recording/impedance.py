@@ -0,0 +1,52 @@
+from numpy import asarray, float64, full, hanning, maximum, mean, nan, ndarray, sqrt
+from numpy.fft import irfft, rfft, rfftfreq
+
+# ADS1299 AC lead-off drive as configured by the OpenBCI firmware
+LEAD_OFF_FREQUENCY = 31.2
+LEAD_OFF_CURRENT = 6e-9
+LEAD_OFF_BAND = 3.0
+# Resistor in series with every Cyton input
+SERIES_RESISTANCE = 2200
+REFERENCE_VOLTAGE = 4.5
+FULL_SCALE = (1 << 23) - 1
+
+IMPEDANCE_DURATION = 0.4
+# As in the OpenBCI GUI, 2500 B/s for the EOG pair leaves most of the link free
+IMPEDANCE_SAMPLING_RATE = 250
+# The first samples after enabling lead-off carry the switching transient
+IMPEDANCE_SETTLE = 0.1
+
+
+def counts_to_volts(data: ndarray, gains: ndarray) -> ndarray:
+    return data * (REFERENCE_VOLTAGE / FULL_SCALE / asarray(gains, dtype=float64))
+
+
+def band_rms(data: ndarray, sampling_rate: float, low: float, high: float) -> ndarray:
+    # Band limiting in the frequency domain for every channel at once
+    samples = data.shape[0]
+    centered = data - mean(data, axis=0)
+    window = hanning(samples)[:, None]
+
+    spectrum = rfft(centered * window, axis=0)
+    frequencies = rfftfreq(samples, 1 / sampling_rate)
+    spectrum[(frequencies < low) | (frequencies > high)] = 0
+
+    band = irfft(spectrum, n=samples, axis=0)
+    # Undo the power the window took away
+    return sqrt(mean(band ** 2, axis=0) / mean(window ** 2))
+
+
+def estimate_impedance(data: ndarray, sampling_rate: float, gains: ndarray) -> ndarray:
+    if data.shape[0] < sampling_rate / LEAD_OFF_FREQUENCY * 4:
+        return full(data.shape[1], nan)
+
+    # Never narrower than the main lobe of the window, two bins each side
+    band = max(LEAD_OFF_BAND, 2 * sampling_rate / data.shape[0])
+
+    volts = counts_to_volts(data.astype(float64), gains)
+    rms = band_rms(volts, sampling_rate, LEAD_OFF_FREQUENCY - band, LEAD_OFF_FREQUENCY + band)
+
+    # Peak of the lead-off fundamental over the drive current, minus the series
+    # resistor, as the OpenBCI GUI computes it
+    impedance = sqrt(2) * rms / LEAD_OFF_CURRENT - SERIES_RESISTANCE
+    return maximum(impedance, 0)
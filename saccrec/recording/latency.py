@@ -0,0 +1,73 @@
+import array
+import fcntl
+import termios
+from os.path import basename, exists, join, realpath
+from typing import NamedTuple, Optional
+
+from serial import Serial
+
+ASYNC_LOW_LATENCY = 0x2000
+
+# Index of the flags field in struct serial_struct viewed as an int array
+_SERIAL_FLAGS = 4
+
+_USB_SERIAL_SYSFS = '/sys/bus/usb-serial/devices'
+
+
+class LatencyReport(NamedTuple):
+    low_latency: Optional[bool]
+    latency_timer: Optional[int]
+
+
+def _serial_flags(fd: int) -> Optional[int]:
+    buf = array.array('i', [0] * 32)
+    try:
+        fcntl.ioctl(fd, termios.TIOCGSERIAL, buf)
+    except OSError:
+        return None
+    return buf[_SERIAL_FLAGS]
+
+
+def _set_low_latency(fd: int) -> Optional[bool]:
+    if (flags := _serial_flags(fd)) is None:
+        return None
+
+    if not flags & ASYNC_LOW_LATENCY:
+        buf = array.array('i', [0] * 32)
+        try:
+            fcntl.ioctl(fd, termios.TIOCGSERIAL, buf)
+            buf[_SERIAL_FLAGS] |= ASYNC_LOW_LATENCY
+            fcntl.ioctl(fd, termios.TIOCSSERIAL, buf)
+        except OSError:
+            pass
+        flags = _serial_flags(fd)
+
+    return flags is not None and bool(flags & ASYNC_LOW_LATENCY)
+
+
+def _latency_timer_path(port: str) -> str:
+    return join(_USB_SERIAL_SYSFS, basename(realpath(port)), 'latency_timer')
+
+
+def _set_latency_timer(port: str, value: int) -> Optional[int]:
+    if not exists(path := _latency_timer_path(port)):
+        return None
+
+    try:
+        with open(path, 'wt') as f:
+            f.write(f'{value}\n')
+    except OSError:
+        pass
+
+    try:
+        with open(path, 'rt') as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def tune_latency(serial: Serial, latency_timer: int = 1) -> LatencyReport:
+    return LatencyReport(
+        low_latency=_set_low_latency(serial.fileno()),
+        latency_timer=_set_latency_timer(serial.port, latency_timer)
+    )
@@ -0,0 +1,95 @@
+import logging
+from queue import Full, Queue
+from threading import Thread
+from time import monotonic_ns
+from typing import Callable, Optional
+
+from serial import SerialException
+
+logger = logging.getLogger('saccrec')
+
+MARKER_QUEUE_SIZE = 64
+
+
+class MarkerWriter(Thread):
+
+    def __init__(self, port: str, write_function: Callable[[str], None], maxsize: int = MARKER_QUEUE_SIZE):
+        super(MarkerWriter, self).__init__(name=f'saccrec-markers-{port}', daemon=True)
+
+        self._write_function = write_function
+        self._queue: Queue = Queue(maxsize)
+
+        self._last_label: Optional[str] = None
+        self._written: list[tuple[str, int]] = []
+        self._dropped = 0
+        self._last_latency = 0
+        self._max_latency = 0
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    @property
+    def dropped(self) -> int:
+        return self._dropped
+
+    @property
+    def last_latency(self) -> float:
+        return self._last_latency / 1e9
+
+    @property
+    def max_latency(self) -> float:
+        return self._max_latency / 1e9
+
+    @property
+    def written(self) -> list[tuple[str, int]]:
+        return list(self._written)
+
+    def reset(self):
+        self._last_label = None
+        self._written = []
+        self._max_latency = 0
+
+    def resend(self) -> bool:
+        label, self._last_label = self._last_label, None
+        return label is not None and self.put(label)
+
+    def put(self, label: str) -> bool:
+        # The stimulus refreshes every frame but only position changes matter
+        if label == self._last_label:
+            return False
+
+        try:
+            self._queue.put_nowait((label, monotonic_ns()))
+        except Full:
+            self._dropped += 1
+            return False
+
+        self._last_label = label
+        return True
+
+    def flush(self):
+        if self.is_alive():
+            self._queue.join()
+
+    def stop(self, timeout: float = 1.0):
+        self._queue.put((None, 0), timeout=timeout)
+        if self.is_alive():
+            self.join(timeout)
+
+    def run(self):
+        while (item := self._queue.get())[0] is not None:
+            label, queued = item
+            try:
+                self._write_function(label)
+            except (SerialException, OSError) as error:
+                logger.error(f'Marker {label} not written: {error}')
+            else:
+                written = monotonic_ns()
+                self._written.append((label, written))
+                self._last_latency = written - queued
+                self._max_latency = max(self._max_latency, self._last_latency)
+            finally:
+                self._queue.task_done()
+
+        self._queue.task_done()
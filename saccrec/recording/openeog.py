@@ -1,40 +1,172 @@
 import atexit
 import logging
 import re
-from struct import unpack
-from time import sleep
-
-from serial import Serial
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from os.path import exists, realpath
+from select import select
+from threading import Lock
+from time import monotonic, monotonic_ns, perf_counter, sleep
+from typing import Collection, Iterator, Optional
+
+from numpy import ndarray
+from serial import Serial, SerialException
 from serial.tools.list_ports import comports
 
+from saccrec.core.enums import BacklogPolicy, FillPolicy, SamplingRate
 from saccrec.settings import hardware as conf
 
+from .acquisition import AcquisitionWorker
+from .buffer import SampleBatch, SampleRingBuffer, concatenate_batches
+from .capture import CaptureWriter
+from .clock import ClockModel
+from .decoder import EOG_CHANNELS, frame_size
+from .impedance import IMPEDANCE_DURATION, IMPEDANCE_SAMPLING_RATE, IMPEDANCE_SETTLE, estimate_impedance
+from .latency import tune_latency
+from .markers import MarkerWriter
+from .overflow import OverflowMonitor
+from .receiver import ReceiveBuffer
+from .sequence import SequenceTracker
+from .stream import StreamWriter
+from .telemetry import Telemetry, TelemetrySnapshot
+
 logger = logging.getLogger('saccrec')
 
 _COM_ERROR = 'Communications timeout - Device failed to poll Host'
+TERMINATOR = b'$$$'
+_FIRMWARE_NAME = b'OpenEOG'
 BUFFER_SIZE = 60
+COMMAND_TIMEOUT = 0.5
+CONNECT_ATTEMPTS = 3
+RESPONSE_POLL = 0.05
+PROBE_TIMEOUT = 1.0
 
+BAUD_RATE = 115200
+# 8N1 framing puts ten bits on the wire for every byte
+LINK_BYTE_RATE = BAUD_RATE // 10
 
-class CytonBoard:
+# FTDI FT232R and FT231X, used by the OpenBCI / OpenEOG USB dongles
+OPENEOG_USB_IDS = {
+    (0x0403, 0x6001),
+    (0x0403, 0x6015),
+}
+RING_CAPACITY = 1 << 16
 
-    @staticmethod
-    def list_ports() -> list[str]:
-        filter_regex = 'OpenEOG'
-        devices = [p.device for p in comports()]
+RECOVERY_TIMEOUT = 5.0
+RECOVERY_POLL = 0.1
+
+# Default FTDI latency timer: the longest a partial USB packet is held back
+USB_LATENCY = 0.016
+
+
+def max_sampling_rate(channels: int) -> int:
+    return LINK_BYTE_RATE // frame_size(channels)
+
+
+def parse_response(cmd: str, msg: bytes) -> tuple[str, bool]:
+    is_error = False
+    decoded_message = msg.decode('ASCII', errors='ignore')
+    if '[MSG]' in decoded_message:
+        decoded_message = decoded_message.split('[MSG]')[1].strip()
+    elif '[ERR]' in decoded_message:
+        is_error = True
+        decoded_message = decoded_message.split('[ERR]')[1].strip()
+
+    if _COM_ERROR in decoded_message:
+        logger.error(f'<strong>[{cmd}]</strong>: {decoded_message}')
+        return decoded_message, False
+    elif 'createfdContiguous failCorresponding' in decoded_message:
+        logger.error(f'<strong>[{cmd}]</strong>: {decoded_message}')
+        return decoded_message, False
+
+    if is_error:
+        logger.error(f'<strong>[{cmd}]</strong>: {decoded_message}')
+    else:
+        logger.info(f'<strong>[{cmd}]</strong>: {decoded_message}')
+    return decoded_message, True
+
+
+def split_response(data: bytes, count: int = 1) -> tuple[bytes, bytes]:
+    # Everything up to the count-th terminator, and what followed it
+    end = 0
+    for index in range(count):
+        if (found := data.find(TERMINATOR, end)) < 0:
+            return data, b''
+        end = found + len(TERMINATOR)
+    return data[:end], data[end:]
 
-        def _get_firmware_string(port, timeout=0):
-            with Serial(port=port, baudrate=115200, timeout=timeout) as ser:
-                ser.write(b'v')
-                sleep(1)
-                return ser.read_all().decode('utf-8', errors='ignore')
 
-        ports = []
-        for device in devices:
-            msg = _get_firmware_string(device)
-            if re.search(filter_regex, msg):
-                ports.append(device)
+def _probe_firmware(port: str, timeout: float = PROBE_TIMEOUT) -> Optional[str]:
+    deadline = monotonic() + timeout
+    banner = b''
+    try:
+        # Exclusive, like every open here: a port another station or process is
+        # streaming from fails to open instead of receiving the probe
+        with Serial(port=port, baudrate=BAUD_RATE, timeout=RESPONSE_POLL, exclusive=True) as ser:
+            ser.write(b'v')
+            while (remaining := deadline - monotonic()) > 0:
+                ser.timeout = min(remaining, RESPONSE_POLL)
+                banner += ser.read(max(1, ser.in_waiting))
+                if _FIRMWARE_NAME in banner:
+                    return banner.decode('utf-8', errors='ignore')
+    except (SerialException, OSError):
+        pass
 
-        return ports
+    return None
+
+
+class BacklogOverflowError(RuntimeError):
+    pass
+
+
+class CommandTimeoutError(IOError):
+    pass
+
+
+class CytonBoard:
+
+    @staticmethod
+    def iter_ports(
+        timeout: float = PROBE_TIMEOUT,
+        use_cache: bool = True,
+        exclude: Collection[str] = ()
+    ) -> Iterator[str]:
+        # pyserial fills vid/pid/serial_number from /sys/class/tty/*/device, so
+        # anything that is not an FTDI dongle is never opened
+        candidates = [
+            port
+            for port in comports()
+            if (port.vid, port.pid) in OPENEOG_USB_IDS and port.device not in exclude
+        ]
+
+        # Loaded even without use_cache, the probed banners are merged into it
+        known_boards = conf.known_boards
+
+        devices = []
+        for port in candidates:
+            if use_cache and port.serial_number is not None and port.serial_number in known_boards:
+                yield port.device
+            else:
+                devices.append(port)
+
+        if not devices:
+            return
+
+        with ThreadPoolExecutor(max_workers=len(devices)) as executor:
+            futures = {
+                executor.submit(_probe_firmware, port.device, timeout): port
+                for port in devices
+            }
+            for future in as_completed(futures):
+                if (banner := future.result()) is not None:
+                    port = futures[future]
+                    if port.serial_number is not None:
+                        known_boards[port.serial_number] = banner.replace('$$$', '').strip()
+                        conf.known_boards = known_boards
+                    yield port.device
+
+    @staticmethod
+    def list_ports() -> list[str]:
+        return sorted(CytonBoard.iter_ports())
 
     def __init__(self, port: str):
         logger.info('Initializing Cyton Board')
@@ -45,78 +177,276 @@ class CytonBoard:
 
         self._processed_samples = 0
         self._ready = True
-        self._buffer = b''
+        self._buffer = ReceiveBuffer()
+
+        self._backlog_limit = conf.backlog_limit
+        self._backlog_policy = conf.backlog_policy
+        self._backlog_warned = False
+        self._dropped_frames = 0
+
+        self._sequence = SequenceTracker(conf.fill_policy, conf.sampling_rate)
+        self._telemetry = Telemetry()
+        self._overflow = OverflowMonitor(frame_size=self._buffer.frame_size)
+        self._clock = ClockModel(conf.sampling_rate)
+        self._sample_count = 0
+        self._started_at = self._last_data_at = 0.0
+        self._samples = SampleRingBuffer(RING_CAPACITY)
+        self._worker: Optional[AcquisitionWorker] = None
+        self._capture: Optional[CaptureWriter] = None
+        self._stream_writer: Optional[StreamWriter] = None
+
+        # Commands and markers are written from different threads
+        self._write_lock = Lock()
+        # Held while the port is closed and reopened by the acquisition worker
+        self._port_lock = Lock()
+        self._markers = MarkerWriter(port, self._write_marker)
+
+        self._outages: list[dict] = []
+        self._recovering = False
+        # Rate and EOG pair commands the board last accepted
+        self._applied: dict[str, str] = {}
+        self._usb_serial = next(
+            (info.serial_number for info in comports() if info.device == realpath(port)),
+            None
+        )
 
+        self._open(port)
+
+        self._markers.start()
+
+        self._upload_commands = self._settings_commands()
+        self._configure(self._upload_commands)
+
+    def _open(self, port: str):
+        self._port = port
         self._serial = Serial(
             port=port,
-            baudrate=115200,
-            timeout=0
+            baudrate=BAUD_RATE,
+            timeout=0,
+            exclusive=True
         )
 
-        sleep(2)
+        latency = tune_latency(self._serial)
+        self._read_timeout = latency.latency_timer / 1000 if latency.latency_timer else USB_LATENCY
+        logger.info(_('USB low latency: {low_latency}, latency timer: {latency_timer} ms').format(
+            low_latency=latency.low_latency,
+            latency_timer=latency.latency_timer
+        ))
 
-        self._command('v', wait=1)
-        self._command(conf.eog_channels_command)
+    def _configure(self, commands: list[str]):
+        try:
+            for attempt in range(CONNECT_ATTEMPTS):
+                try:
+                    self._command('v', timeout=1)
+                    break
+                except CommandTimeoutError:
+                    if attempt == CONNECT_ATTEMPTS - 1:
+                        raise
+
+            self._upload_settings(commands)
+        except CommandTimeoutError as error:
+            self._ready = False
+            logger.error(str(error))
+            return
 
-        for index, channel in enumerate(conf.channels):
-            if channel.active:
-                cmd = channel.settings_command
-                if 'too few chars' in self._command(cmd):
-                    self._ready = False
-                    logger.error(_('Error setting OpenEOG Channel {index}').format(
-                        index=index + 1
-                    ))
-
-        sleep(1)
         if msg := self._serial.read_all():
             logger.warn(f'Hanged data: {msg}')
 
-    board_instance = None
+    def _settings_commands(self) -> list[str]:
+        # Reads the shared QSettings, so it only runs on the GUI thread
+        limit = max_sampling_rate(EOG_CHANNELS)
+        if conf.sampling_rate_command is not None and conf.sampling_rate > limit:
+            logger.warning(_('{rate} Hz exceeds the {limit} frames/s the serial link can carry').format(
+                rate=conf.sampling_rate,
+                limit=limit
+            ))
+
+        commands = []
+        if conf.sampling_rate_command is not None:
+            commands.append(conf.sampling_rate_command)
+        commands.append(conf.eog_channels_command)
+        for channel in conf.channels:
+            if channel.active:
+                commands.append(channel.settings_command)
+        return commands
+
+    def _upload_settings(self, commands: list[str]):
+        # Always sent: a power-cycled board comes back on the same port with
+        # the same banner but with the firmware defaults
+        responses = self._command_batch(commands, timeout=COMMAND_TIMEOUT * len(commands))
+        for command, response in zip(commands, responses):
+            if 'too few chars' in response:
+                self._ready = False
+                logger.error(_('Error setting OpenEOG {command}').format(command=command))
+            elif command[0] in '~N':
+                self._applied[command[0]] = command
+
+    # Every open board, so several stations can record from one process
+    _instances: list['CytonBoard'] = []
+
+    @property
+    def port(self) -> str:
+        return self._port
+
+    # Ports being opened or reopened, not yet (or no longer) behind a board port
+    _claimed: set[str] = set()
+    _claimed_lock = Lock()
+
+    @classmethod
+    def _claim(cls, port: str):
+        with cls._claimed_lock:
+            cls._claimed.add(port)
+
+    @classmethod
+    def _release(cls, port: str):
+        with cls._claimed_lock:
+            cls._claimed.discard(port)
 
     @classmethod
     def reset(cls, port: str):
-        if cls.board_instance is not None:
-            cls.board_instance.close()
-        cls.board_instance = CytonBoard(port=port)
-        return cls.board_instance
-
-    def _command(self, cmd: str, wait: float = 0.2) -> str:
-        self._serial.write(cmd.encode('ASCII'))
-
-        if wait > 0:
-            sleep(wait)
-
-            msg = self._serial.read_all()
-            if b'$$$' in msg:
-                is_error = False
-                decoded_message = msg.decode('ASCII', errors='ignore')
-                if '[MSG]' in decoded_message:
-                    decoded_message = decoded_message.split('[MSG]')[1].strip()
-                elif '[ERR]' in decoded_message:
-                    is_error = True
-                    decoded_message = decoded_message.split('[ERR]')[1].strip()
-
-                if _COM_ERROR in decoded_message:
-                    logger.error(f'<strong>[{cmd}]</strong>: {decoded_message}')
-                    self._ready = False
-                elif 'createfdContiguous failCorresponding' in decoded_message:
-                    logger.error(f'<strong>[{cmd}]</strong>: {decoded_message}')
-                    self._ready = False
-                else:
-                    if is_error:
-                        logger.error(f'<strong>[{cmd}]</strong>: {decoded_message}')
-                    else:
-                        logger.info(f'<strong>[{cmd}]</strong>: {decoded_message}')
-                return decoded_message
-            else:
-                logger.info(f'<strong>[{cmd}]</strong>')
+        for board in cls.instances():
+            if board.port == port:
+                board.close()
+
+        cls._claim(port)
+        try:
+            board = CytonBoard(port=port)
+            cls._instances.append(board)
+        finally:
+            cls._release(port)
+        return board
+
+    @classmethod
+    def instances(cls) -> list['CytonBoard']:
+        return list(cls._instances)
+
+    @classmethod
+    def busy_ports(cls) -> set[str]:
+        with cls._claimed_lock:
+            busy = set(cls._claimed)
+        busy.update(board.port for board in cls._instances)
+
+        # A recovering dongle may come back under any /dev/ttyUSBn
+        if recovering := {board._usb_serial for board in cls._instances if board._recovering}:
+            busy.update(info.device for info in comports() if info.serial_number in recovering)
+        return busy
+
+    def _read_response(self, cmd: str, timeout: float, count: int = 1) -> bytes:
+        deadline = monotonic() + timeout
+        response = bytearray()
+        previous_timeout = self._serial.timeout
+        try:
+            while response.count(TERMINATOR) < count:
+                if (remaining := deadline - monotonic()) <= 0:
+                    raise CommandTimeoutError(
+                        f'No response to <strong>[{cmd}]</strong> after {timeout:.1f} s'
+                    )
+                self._serial.timeout = min(remaining, RESPONSE_POLL)
+                response += self._serial.read(max(1, self._serial.in_waiting))
+        finally:
+            self._serial.timeout = previous_timeout
+
+        # After '(' the first stream frames arrive right behind the terminator
+        response, rest = split_response(bytes(response), count)
+        self._buffer.feed(rest, self._capture.write if self._capture is not None else None)
+        return response
+
+    def _parse_response(self, cmd: str, msg: bytes) -> str:
+        decoded_message, ok = parse_response(cmd, msg)
+        if not ok:
+            self._ready = False
+        return decoded_message
+
+    def _write(self, data: str):
+        with self._write_lock:
+            self._serial.write(data.encode('ASCII'))
+
+    def _command(self, cmd: str, timeout: float = COMMAND_TIMEOUT) -> str:
+        # Markers queued before a command must reach the board before it
+        self._markers.flush()
+        self._write(cmd)
+
+        if timeout > 0:
+            return self._parse_response(cmd, self._read_response(cmd, timeout))
 
         return ''
 
+    def _command_batch(self, commands: list[str], timeout: float = COMMAND_TIMEOUT) -> list[str]:
+        self._write(''.join(commands))
+
+        msg = self._read_response(' '.join(commands), timeout, count=len(commands))
+        responses = msg.split(TERMINATOR)[:len(commands)]
+        return [
+            self._parse_response(cmd, response + TERMINATOR)
+            for cmd, response in zip(commands, responses)
+        ]
+
     @property
     def ready(self) -> bool:
         return self._ready
 
+    @property
+    def dropped_frames(self) -> int:
+        return self._dropped_frames
+
+    @property
+    def resyncs(self) -> int:
+        return self._buffer.resyncs
+
+    @property
+    def recording(self) -> bool:
+        return self._recording
+
+    @property
+    def sample_count(self) -> int:
+        return self._sample_count
+
+    @property
+    def throughput(self) -> float:
+        if not self._recording or (elapsed := monotonic() - self._started_at) <= 0:
+            return 0.0
+        return self._sample_count / elapsed
+
+    @property
+    def buffered_samples(self) -> int:
+        return len(self._samples)
+
+    @property
+    def pending_samples(self) -> int:
+        try:
+            waiting = self._serial.in_waiting // self._buffer.frame_size
+        except (SerialException, OSError):
+            waiting = 0
+        return len(self._samples) + self._buffer.frames + waiting
+
+    @property
+    def telemetry(self) -> TelemetrySnapshot:
+        return TelemetrySnapshot(
+            bytes_rate=self._telemetry.bytes_rate,
+            frames_rate=self._telemetry.frames_rate,
+            resyncs=self._buffer.resyncs,
+            sync_losses=self._buffer.sync_losses,
+            invalid_positions=self._buffer.invalid_positions,
+            waiting_peak=self._buffer.waiting_peak,
+            decode_time=self._telemetry.decode_time,
+            decode_time_peak=self._telemetry.decode_time_peak,
+            backlog=self.pending_samples,
+            lost_samples=self._sequence.lost,
+            cpu_usage=self.cpu_usage
+        )
+
+    @property
+    def cpu_usage(self) -> float:
+        return self._worker.cpu_usage if self._worker is not None else 0.0
+
+    @property
+    def lost_samples(self) -> int:
+        return self._sequence.lost
+
+    @property
+    def duplicated_samples(self) -> int:
+        return self._sequence.duplicates
+
     def close(self):
         if self._recording:
             self.stop()
@@ -124,78 +454,378 @@ class CytonBoard:
         if self._sd_open:
             self.close_sd_file()
 
+        self._markers.stop()
         self._serial.close()
 
+        if self in CytonBoard._instances:
+            CytonBoard._instances.remove(self)
+
         logger.info('Closing Cyton Board')
 
     def create_sd_file(self) -> str:
-        msg = self._command('S', wait=2)
         try:
+            msg = self._command('S', timeout=2)
             result = re.search('[0-9A-F]{6}.EOG', msg)[0]
             self._sd_open = True
             return result
+        except CommandTimeoutError as error:
+            logger.error(str(error))
+            self._ready = False
         except TypeError:
             print(msg)
             self._ready = False
 
     def close_sd_file(self):
-        self._command('j', wait=2)
+        try:
+            self._command('j', timeout=2)
+        except CommandTimeoutError as error:
+            logger.error(str(error))
         self._sd_open = False
         logger.info('SD File Closed')
 
-    def start(self):
-        self._buffer = b''
+    def start(self, capture_path: Optional[str] = None):
+        if capture_path is not None:
+            self._capture = CaptureWriter(capture_path, EOG_CHANNELS, conf.sampling_rate)
+            logger.info(_('Capturing raw serial data to {path}').format(path=capture_path))
+
+        self._buffer.clear()
+        self._buffer.reset_statistics()
+        self._telemetry.reset()
+        self._overflow.reset()
+        self._dropped_frames = 0
+        self._markers.reset()
+        self._sequence.reset()
+        self._clock.reset()
+        self._sample_count = 0
+        self._started_at = self._last_data_at = monotonic()
+        self._outages = []
+        self._samples.clear()
+        # Replayed by _recover() from the acquisition worker
+        self._upload_commands = self._settings_commands()
         self._serial.reset_input_buffer()
-        sleep(1)
         try:
-            self._command('(', wait=2)
+            self._command('(', timeout=2)
             self._recording = True
-        except ValueError:
+        except CommandTimeoutError:
             self._recording = True
 
+        self._worker = AcquisitionWorker(
+            self._port,
+            self._acquire,
+            self._samples,
+            idle_wait=self._read_timeout,
+            wait_function=self._wait_for_data,
+            recover_function=self._recover,
+            stall_timeout=conf.stall_timeout / 1000
+        )
+        self._worker.start()
+
+    def _stop_worker(self):
+        if self._worker is not None:
+            if not self._worker.stop(timeout=RECOVERY_TIMEOUT):
+                logger.warning(_('Acquisition worker still reconnecting, waiting for the port'))
+            logger.info(_('Acquisition CPU usage: {usage:.1f} ms/s').format(
+                usage=self._worker.cpu_usage * 1000
+            ))
+            self._worker = None
+
     def stop(self):
-        self._serial.reset_input_buffer()
-        self._command(')', wait=1).strip()
-        self._recording = False
-        self._serial.reset_input_buffer()
-        self._buffer = b''
+        self._stop_worker()
+        # A worker that outlived the join is still reopening the port
+        with self._port_lock:
+            try:
+                self._serial.reset_input_buffer()
+                self._command(')', timeout=1)
+            except (CommandTimeoutError, SerialException, OSError) as error:
+                logger.warning(str(error))
+            self._recording = False
+            try:
+                self._serial.reset_input_buffer()
+            except (SerialException, OSError):
+                pass
+            self._buffer.clear()
+
+        if self._capture is not None:
+            self._capture.close()
+            self._capture = None
+
+        if self._sequence.lost > 0:
+            logger.warning(_('{lost} samples lost in {gaps} gaps, filled with {policy}').format(
+                lost=self._sequence.lost,
+                gaps=self._sequence.gaps,
+                policy=self._sequence.fill_policy.label.lower()
+            ))
+
+        if self._sequence.rejected > 0:
+            logger.warning(_('{rejected} frames with an implausible sequence number dropped, {resyncs} resyncs').format(
+                rejected=self._sequence.rejected,
+                resyncs=self._sequence.resyncs
+            ))
+
+    def _check_backlog(self, incoming: int):
+        # The backlog that grows is the consumer side: samples decoded but not
+        # yet taken from the ring by the GUI
+        backlog = len(self._samples) + incoming
+        if backlog <= self._backlog_limit:
+            self._backlog_warned = False
+            return
+
+        excess = backlog - self._backlog_limit
+        if self._backlog_policy == BacklogPolicy.DropOldest:
+            self._dropped_frames += self._samples.discard(excess)
+        elif self._backlog_policy == BacklogPolicy.Warn:
+            if not self._backlog_warned:
+                logger.warning(f'Backlog of {backlog} samples exceeds {self._backlog_limit}')
+                self._backlog_warned = True
+        else:
+            raise BacklogOverflowError(
+                f'Backlog of {backlog} samples exceeds {self._backlog_limit}'
+            )
+
+    def read(self, drain: bool = True) -> SampleBatch:
+        self._buffer.fill(self._serial, self._capture.write if self._capture is not None else None)
+
+        limit = None if drain else max(1, BUFFER_SIZE // self._buffer.frame_size)
+
+        decode_start = perf_counter()
+        batch = self._buffer.decode(limit)
+        self._telemetry.record(self._buffer.received, batch.size, perf_counter() - decode_start)
+        return batch
+
+    def _find_port(self) -> Optional[str]:
+        # The dongle may come back under a different /dev/ttyUSBn
+        if self._usb_serial is not None:
+            for info in comports():
+                if info.serial_number == self._usb_serial:
+                    return info.device
+            return None
+
+        return self._port if exists(self._port) else None
+
+    def _recover(self, error: Optional[Exception]) -> bool:
+        reason = str(error) if error is not None else _('no data')
+        logger.warning(_('Stream lost ({reason}), reconnecting').format(reason=reason))
+
+        detected_at = monotonic()
+        deadline = detected_at + RECOVERY_TIMEOUT
+        recovered = False
+        self._recovering = True
+
+        with self._port_lock:
+            try:
+                self._serial.close()
+            except (SerialException, OSError):
+                pass
+        # Before reopening: the restart command may already feed new frames
+        self._buffer.clear()
+
+        while not recovered and self._worker is not None and self._worker.running and monotonic() < deadline:
+            if (port := self._find_port()) is None:
+                sleep(RECOVERY_POLL)
+                continue
+
+            CytonBoard._claim(port)
+            try:
+                with self._port_lock:
+                    # stop() may have given up on the join while this attempt waited
+                    if self._worker is None or not self._worker.running:
+                        break
+                    self._open(port)
+                    self._ready = True
+                    self._configure(self._upload_commands)
+                    if self._ready:
+                        try:
+                            self._command('(', timeout=2)
+                        except CommandTimeoutError:
+                            pass
+                        recovered = True
+            except (SerialException, OSError):
+                sleep(RECOVERY_POLL)
+            finally:
+                CytonBoard._release(port)
+
+        self._recovering = False
+        ended_at = monotonic()
+        self._sequence.restart()
+        # The samples after the outage are not on the grid of the ones before
+        self._clock.split(self._sample_count)
+        self._outages.append({
+            'started_at': self._last_data_at,
+            'detected_at': detected_at,
+            'ended_at': ended_at,
+            'recovery': ended_at - detected_at,
+            'sample': self._sample_count,
+            'reason': reason,
+            'recovered': recovered,
+        })
+
+        if recovered:
+            # A rebooted board lost its position code and a marker may have
+            # been dropped with the port, so the current one is sent again
+            self._markers.resend()
+            logger.warning(_('Stream recovered on {port} after {duration:.0f} ms').format(
+                port=self._port,
+                duration=(ended_at - detected_at) * 1000
+            ))
+        else:
+            self._ready = False
+            logger.error(_('Could not recover the stream in {timeout:.0f} s').format(
+                timeout=RECOVERY_TIMEOUT
+            ))
 
-    def read(self) -> tuple[int, int, int, int]:
-        buff = self._serial.read(self._serial.in_waiting)
+        return recovered
 
-        self._buffer += buff
-        index = 0
-        while index < len(self._buffer) and self._buffer[index] != 0:
-            index += 1
+    @property
+    def outages(self) -> list[dict]:
+        return list(self._outages)
+
+    def check_impedance(self, gains: dict[int, int], duration: float = IMPEDANCE_DURATION) -> dict[int, float]:
+        # Runs off the GUI thread, so the active channels and their gains are
+        # taken by the caller
+        if self._recording or not self._ready:
+            logger.error(_('Impedance can only be checked on an idle board'))
+            return {}
+
+        # Without the rate in effect the board could not be put back
+        if '~' not in self._applied:
+            logger.error(_('Impedance can not be checked at a sampling rate without a firmware code'))
+            return {}
+
+        channels = sorted(gains)
+        if not channels:
+            return {}
+
+        # The firmware only streams the pair selected with 'N', so the channels
+        # are measured two at a time. An odd one out is paired with the first.
+        pairs = [channels[index:index + 2] for index in range(0, len(channels), 2)]
+        if len(pairs[-1]) == 1:
+            pairs[-1].append(channels[0])
+
+        result = {}
+        try:
+            self._command(f'~{SamplingRate(IMPEDANCE_SAMPLING_RATE).settings}', timeout=1)
+            for pair in pairs:
+                impedance = self._pair_impedance(pair, [gains[channel] for channel in pair], duration)
+                for channel, value in zip(pair, impedance):
+                    result.setdefault(channel, value)
+        except CommandTimeoutError as error:
+            logger.error(str(error))
+        finally:
+            self._serial.reset_input_buffer()
+            try:
+                restore = list(self._applied.values())
+                self._command_batch(restore, timeout=COMMAND_TIMEOUT * len(restore))
+            except CommandTimeoutError as error:
+                logger.error(str(error))
+
+        for channel, value in result.items():
+            logger.info(_('Channel {channel} impedance: {value:.1f} kΩ').format(
+                channel=channel,
+                value=value / 1000
+            ))
+        return result
 
-        if index > 0:
-            self._buffer = self._buffer[index:]
+    def _pair_impedance(self, pair: list[int], gains: list[int], duration: float) -> list[float]:
+        lead_off = sorted(set(pair))
+        self._command_batch(
+            [f'N{pair[0]}{pair[1]}'] + [f'z{channel}10Z' for channel in lead_off],
+            timeout=COMMAND_TIMEOUT * (len(lead_off) + 1)
+        )
 
-        if len(self._buffer) >= BUFFER_SIZE:
-            buff = self._buffer[:BUFFER_SIZE]
-            self._buffer = self._buffer[BUFFER_SIZE:]
+        # Gaps are filled so the lead-off tone is analysed on a uniform grid
+        buffer = ReceiveBuffer(channels=len(pair))
+        sequence = SequenceTracker(FillPolicy.Linear, IMPEDANCE_SAMPLING_RATE)
+        batches = []
+        try:
+            self._serial.reset_input_buffer()
+            self._write('(')
+            settle_until = monotonic() + IMPEDANCE_SETTLE
+            deadline = settle_until + duration
+            while (now := monotonic()) < deadline:
+                self._wait_for_data(deadline - now)
+                buffer.fill(self._serial)
+                batch = sequence.process(buffer.decode(), monotonic())
+                if now >= settle_until and batch.size > 0:
+                    batches.append(batch)
+
+            self._command(')', timeout=1)
+        finally:
+            self._serial.reset_input_buffer()
+            self._command_batch(
+                [f'z{channel}00Z' for channel in lead_off],
+                timeout=COMMAND_TIMEOUT * len(lead_off)
+            )
+
+        if sequence.lost > 0:
+            logger.warning(_('{lost} samples lost while checking impedance').format(lost=sequence.lost))
+
+        if not batches:
+            return []
+
+        data = concatenate_batches(batches).data
+        return estimate_impedance(data, IMPEDANCE_SAMPLING_RATE, gains).tolist()
+
+    def _wait_for_data(self, timeout: float) -> bool:
+        return bool(select([self._serial.fileno()], [], [], timeout)[0])
+
+    def _acquire(self) -> SampleBatch:
+        host_ns = monotonic_ns()
+        lost = self._sequence.lost
+        batch = self._sequence.process(self.read(), host_ns / 1e9)
+
+        self._overflow.update(
+            self._buffer.waiting,
+            host_ns / 1e9,
+            self._sample_count,
+            self._sequence.lost - lost
+        )
 
-        result = []
+        if batch.size > 0:
+            self._check_backlog(batch.size)
 
-        if len(buff) == BUFFER_SIZE:
-            for i in range(BUFFER_SIZE // 10):
-                if sample := buff[i * 10:i * 10 + 10]:
-                    header = sample[0]
-                    if header == 0:
-                        if (position := sample[-1]) in {0x01, 0x02, 0x04, 0x08, 0x10}:
-                            index, horizontal, vertical = unpack('>H3s3s', sample[1:-1])
-                            horizontal = unpack('>I', b'\00' + horizontal)[0]
-                            vertical = unpack('>I', b'\00' + vertical)[0]
+            if (writer := self._stream_writer) is not None:
+                writer.put(batch)
 
-                            result.append((index, horizontal, vertical, position))
+            self._last_data_at = host_ns / 1e9
+            self._sample_count += batch.size
+            self._clock.update(self._sample_count - 1, host_ns)
 
-        return result
+        return batch
+
+    @property
+    def stream_writer(self) -> Optional[StreamWriter]:
+        return self._stream_writer
+
+    @stream_writer.setter
+    def stream_writer(self, value: Optional[StreamWriter]):
+        self._stream_writer = value
+
+    @property
+    def overflows(self) -> list[dict]:
+        return self._overflow.events
+
+    @property
+    def clock(self) -> ClockModel:
+        return self._clock
+
+    def sample_to_host_time(self, samples: ndarray) -> ndarray:
+        return self._clock.sample_to_host_time(samples)
+
+    def samples(self, max_count: Optional[int] = None) -> Optional[SampleBatch]:
+        return self._samples.pop(max_count)
+
+    def _write_marker(self, label: str):
+        self._write(f'O{label}')
 
     def marker(self, label: str):
-        self._command(f'O{label}', wait=0)
+        self._markers.put(label)
+
+    @property
+    def markers(self) -> MarkerWriter:
+        return self._markers
 
 
 @atexit.register
 def close_openbci():
-    if (board := CytonBoard.board_instance) is not None:
+    for board in CytonBoard.instances():
         board.close()
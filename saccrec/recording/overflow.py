@@ -0,0 +1,114 @@
+import logging
+from math import inf
+from typing import Optional
+
+from .decoder import FRAME_SIZE
+
+logger = logging.getLogger('saccrec')
+
+# Linux n_tty read buffer, the most TIOCINQ (in_waiting) can ever report
+TTY_BUFFER_SIZE = 4096
+WARN_FILL = 0.75
+# Warn when the buffer would be full within this many seconds at the current
+# growth, once it is past the early fill level (USB packets land in bursts, so
+# the growth of a nearly empty buffer means nothing)
+EARLY_FILL = 0.25
+OVERFLOW_HORIZON = 0.1
+# Index gaps decoded this long after an event ends are attributed to it
+CORRELATION_WINDOW = 1.0
+GROWTH_SMOOTHING = 0.3
+
+
+class OverflowMonitor:
+
+    def __init__(self, buffer_size: int = TTY_BUFFER_SIZE, frame_size: int = FRAME_SIZE):
+        self._buffer_size = buffer_size
+        self._frame_size = frame_size
+        self.reset()
+
+    def reset(self):
+        self._events: list[dict] = []
+        self._current: Optional[dict] = None
+        self._last_waiting = 0
+        self._last_time: Optional[float] = None
+        self._growth = 0.0
+        self._unattributed_lost = 0
+
+    @property
+    def buffer_size(self) -> int:
+        return self._buffer_size
+
+    @property
+    def growth(self) -> float:
+        return self._growth
+
+    @property
+    def events(self) -> list[dict]:
+        return [dict(event) for event in self._events]
+
+    @property
+    def unattributed_lost(self) -> int:
+        return self._unattributed_lost
+
+    def time_to_overflow(self, waiting: int) -> float:
+        if self._growth <= 0:
+            return inf
+        return max(0, self._buffer_size - waiting) / self._growth
+
+    def update(self, waiting: int, now: float, sample: int, lost: int = 0):
+        if self._last_time is not None and now > self._last_time:
+            growth = (waiting - self._last_waiting) / (now - self._last_time)
+            self._growth += GROWTH_SMOOTHING * (growth - self._growth)
+        self._last_waiting, self._last_time = waiting, now
+
+        # Once the kernel buffer is this full the next frame no longer fits
+        saturated = waiting > self._buffer_size - self._frame_size
+        at_risk = (
+            saturated
+            or waiting >= WARN_FILL * self._buffer_size
+            or (waiting >= EARLY_FILL * self._buffer_size and self.time_to_overflow(waiting) < OVERFLOW_HORIZON)
+        )
+
+        if at_risk and (self._current is None or self._current['ended_at'] is not None):
+            if self._current is None:
+                self._current = {
+                    'started_at': now,
+                    'ended_at': None,
+                    'sample': sample,
+                    'peak': waiting,
+                    'overflow': False,
+                    'lost': 0,
+                    'gaps': 0,
+                }
+                self._events.append(self._current)
+                logger.warning(_('Serial driver buffer at {waiting} of {size} bytes, acquisition falls behind').format(
+                    waiting=waiting,
+                    size=self._buffer_size
+                ))
+            else:
+                self._current['ended_at'] = None
+
+        if (event := self._current) is None:
+            self._unattributed_lost += lost
+            return
+
+        event['peak'] = max(event['peak'], waiting)
+        event['lost'] += lost
+        event['gaps'] += 1 if lost > 0 else 0
+
+        if saturated and not event['overflow']:
+            event['overflow'] = True
+            logger.error(_('Serial driver buffer overflow at sample {sample}, bytes are being dropped').format(
+                sample=sample
+            ))
+
+        if event['ended_at'] is None:
+            if not at_risk:
+                event['ended_at'] = now
+        elif now - event['ended_at'] > CORRELATION_WINDOW:
+            if event['lost'] > 0:
+                logger.warning(_('{lost} samples lost around the serial buffer event at sample {sample}').format(
+                    lost=event['lost'],
+                    sample=event['sample']
+                ))
+            self._current = None
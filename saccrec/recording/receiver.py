@@ -0,0 +1,204 @@
+from typing import Callable, Optional
+
+from serial import Serial
+
+from .buffer import SampleBatch, concatenate_batches
+from .decoder import EOG_CHANNELS, POSITION_CODES, decode_frames, frame_size, valid_prefix
+
+RECEIVE_CAPACITY = 1 << 16
+
+
+class ReceiveBuffer:
+
+    def __init__(self, capacity: int = RECEIVE_CAPACITY, channels: int = EOG_CHANNELS):
+        self._channels = channels
+        self._frame_size = frame_size(channels)
+
+        self._data = bytearray(capacity)
+        self._view = memoryview(self._data)
+        self._start = 0
+        self._end = 0
+
+        self.reset_statistics()
+
+    def reset_statistics(self):
+        self._resyncs = 0
+        self._discarded = 0
+        self._sync_losses = 0
+        self._invalid_positions = 0
+        self._received = 0
+        self._waiting = 0
+        self._waiting_peak = 0
+
+    @property
+    def capacity(self) -> int:
+        return len(self._data)
+
+    @property
+    def channels(self) -> int:
+        return self._channels
+
+    @property
+    def frame_size(self) -> int:
+        return self._frame_size
+
+    @property
+    def frames(self) -> int:
+        return (self._end - self._start) // self._frame_size
+
+    @property
+    def resyncs(self) -> int:
+        return self._resyncs
+
+    @property
+    def discarded(self) -> int:
+        return self._discarded
+
+    @property
+    def sync_losses(self) -> int:
+        return self._sync_losses
+
+    @property
+    def invalid_positions(self) -> int:
+        return self._invalid_positions
+
+    @property
+    def received(self) -> int:
+        return self._received
+
+    @property
+    def waiting(self) -> int:
+        return self._waiting
+
+    @property
+    def waiting_peak(self) -> int:
+        return self._waiting_peak
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def clear(self):
+        self._start = self._end = 0
+
+    def _compact(self):
+        size = self._end - self._start
+        if size > 0 and self._start > 0:
+            self._data[:size] = self._view[self._start:self._end]
+        self._start, self._end = 0, size
+
+    def _reserve(self, size: int):
+        if self._start == self._end:
+            self._start = self._end = 0
+
+        if self._end + size <= len(self._data):
+            return
+
+        # Compaction only happens when the tail runs out of room, so every byte
+        # is moved at most once per trip through the buffer
+        self._compact()
+
+        if self._end + size > len(self._data):
+            capacity = len(self._data)
+            while capacity < self._end + size:
+                capacity *= 2
+
+            data = bytearray(capacity)
+            data[:self._end] = self._view[:self._end]
+            self._data = data
+            self._view = memoryview(self._data)
+
+    def fill(self, serial: Serial, tee: Optional[Callable[[memoryview], None]] = None) -> int:
+        if (waiting := serial.in_waiting) == 0:
+            self._waiting = 0
+            return 0
+
+        self._waiting = waiting
+        self._waiting_peak = max(self._waiting_peak, waiting)
+
+        self._reserve(waiting)
+        count = serial.readinto(self._view[self._end:self._end + waiting]) or 0
+        if tee is not None and count > 0:
+            tee(self._view[self._end:self._end + count])
+        self._end += count
+        self._received += count
+        return count
+
+    def feed(self, data: bytes, tee: Optional[Callable[[memoryview], None]] = None) -> int:
+        # Bytes already taken from the port, e.g. the first frames of a stream
+        # read together with the response that started it
+        if (count := len(data)) == 0:
+            return 0
+
+        self._reserve(count)
+        self._view[self._end:self._end + count] = data
+        if tee is not None:
+            tee(self._view[self._end:self._end + count])
+        self._end += count
+        self._received += count
+        return count
+
+    def _is_frame(self, offset: int) -> bool:
+        if self._data[offset + self._frame_size - 1] not in POSITION_CODES:
+            return False
+
+        following = offset + self._frame_size
+        return following >= self._end or self._data[following] == 0
+
+    def sync(self) -> bool:
+        offset = self._start
+        while True:
+            offset = self._data.find(0, offset, self._end)
+            if offset < 0:
+                offset = self._end
+                break
+
+            if offset + self._frame_size > self._end or self._is_frame(offset):
+                break
+
+            offset += 1
+
+        if offset > self._start:
+            self._resyncs += 1
+            self._discarded += offset - self._start
+            self._start = offset
+
+        return self._start < self._end
+
+    def peek(self, size: int) -> memoryview:
+        return self._view[self._start:self._start + size]
+
+    def take(self, size: int) -> memoryview:
+        view = self.peek(size)
+        self._start += len(view)
+        return view
+
+    def skip(self, size: int):
+        size = min(size, self._end - self._start)
+        self._discarded += size
+        self._start += size
+
+    def decode(self, limit: Optional[int] = None) -> SampleBatch:
+        batches = []
+        while self.sync():
+            if (frames := self.frames) == 0:
+                break
+
+            if limit is not None:
+                frames = min(frames, limit - sum(batch.size for batch in batches))
+
+            if valid := valid_prefix(self.peek(frames * self._frame_size), self._channels):
+                batches.append(decode_frames(self.take(valid * self._frame_size), self._channels))
+
+            if valid == frames:
+                break
+
+            # Corrupted frame in the middle of the stream, resync past its header
+            self._sync_losses += 1
+            if self._data[self._start] == 0 and self._data[self._start + self._frame_size - 1] not in POSITION_CODES:
+                self._invalid_positions += 1
+            self.skip(1)
+
+        if not batches:
+            return decode_frames(b'', self._channels)
+
+        return concatenate_batches(batches)
@@ -0,0 +1,111 @@
+import logging
+from time import monotonic, perf_counter, sleep
+from typing import Callable, NamedTuple, Optional
+
+from saccrec.settings import hardware as conf
+
+from .buffer import SampleBatch
+
+logger = logging.getLogger('saccrec')
+
+SELF_TEST_DURATION = 3.0
+SELF_TEST_INTERVAL = 0.02
+# Delivered samples below this share of the nominal rate mean the link can not keep up
+MIN_DELIVERY = 0.98
+
+
+class SelfTestReport(NamedTuple):
+    sampling_rate: int
+    duration: float
+    received: int
+    lost: int
+    backlog_growth: int
+    busy: float
+
+    @property
+    def delivery(self) -> float:
+        if self.duration <= 0:
+            return 0.0
+        return 100 * self.received / (self.duration * self.sampling_rate)
+
+    @property
+    def headroom(self) -> float:
+        if self.duration <= 0:
+            return 0.0
+        return 100 * (1 - self.busy / self.duration)
+
+    @property
+    def passed(self) -> bool:
+        return (
+            self.delivery >= 100 * MIN_DELIVERY
+            and self.lost == 0
+            and self.backlog_growth <= self.sampling_rate * SELF_TEST_INTERVAL
+            and self.headroom > 0
+        )
+
+    @property
+    def json(self) -> dict:
+        return {
+            'sampling_rate': self.sampling_rate,
+            'duration': self.duration,
+            'received': self.received,
+            'lost': self.lost,
+            'backlog_growth': self.backlog_growth,
+            'delivery': self.delivery,
+            'headroom': self.headroom,
+            'passed': self.passed,
+        }
+
+
+def run_self_test(
+    board,
+    consume: Optional[Callable[[SampleBatch], None]] = None,
+    duration: float = SELF_TEST_DURATION,
+    sampling_rate: Optional[int] = None
+) -> SelfTestReport:
+    # Streams like a real test does: the board decodes on its worker while the
+    # caller pulls batches on its own cadence and displays / stores them
+    sampling_rate = sampling_rate or conf.sampling_rate
+
+    received = 0
+    consumer_busy = 0.0
+    midway_backlog = None
+
+    board.start()
+    started_at = monotonic()
+    try:
+        while (elapsed := monotonic() - started_at) < duration:
+            sleep(SELF_TEST_INTERVAL)
+
+            if (batch := board.samples()) is not None:
+                received += batch.size
+                if consume is not None:
+                    consume_start = perf_counter()
+                    consume(batch)
+                    consumer_busy += perf_counter() - consume_start
+
+            if midway_backlog is None and elapsed >= duration / 2:
+                midway_backlog = board.pending_samples
+
+        final_backlog = board.pending_samples
+        acquisition_busy = board.cpu_usage * (monotonic() - started_at)
+    finally:
+        board.stop()
+
+    elapsed = monotonic() - started_at
+    report = SelfTestReport(
+        sampling_rate=sampling_rate,
+        duration=elapsed,
+        received=received,
+        lost=board.lost_samples,
+        backlog_growth=max(0, final_backlog - (midway_backlog or 0)),
+        busy=acquisition_busy + consumer_busy
+    )
+
+    logger.info(_('Self-test at {rate} Hz: {delivery:.1f} % delivered, {headroom:.1f} % headroom').format(
+        rate=sampling_rate,
+        delivery=report.delivery,
+        headroom=report.headroom
+    ))
+
+    return report
@@ -0,0 +1,196 @@
+from typing import Optional
+
+from numpy import (arange, bool_, concatenate, count_nonzero, cumsum, empty, float32,
+                   full, int64, interp, maximum, nan, ndarray, uint8, uint16, zeros)
+
+from saccrec.core.enums import FillPolicy
+
+from .buffer import SampleBatch, concatenate_batches
+
+SEQUENCE_MODULO = 1 << 16
+# A forward step is plausible while it fits in the host time since the last
+# frame, stretched by this factor plus a fixed margin for link buffering
+SEQUENCE_RATE_SLACK = 1.5
+SEQUENCE_TIME_SLACK = 0.1
+SEQUENCE_STEP_SLACK = 16
+
+
+class SequenceTracker:
+
+    def __init__(self, fill_policy: FillPolicy = FillPolicy.Linear, sampling_rate: Optional[int] = None):
+        self._fill_policy = fill_policy
+        self._sampling_rate = sampling_rate
+        self.reset()
+
+    def reset(self):
+        self.restart()
+
+        self._lost = 0
+        self._gaps = 0
+        self._duplicates = 0
+        self._rejected = 0
+        self._resyncs = 0
+
+    def restart(self):
+        # Forget the running counter (e.g. after the board was reopened) while
+        # keeping the loss statistics of the current test
+        self._last_index: Optional[int] = None
+        self._last_data: Optional[ndarray] = None
+        self._last_position: Optional[int] = None
+        self._last_time: Optional[float] = None
+        self._candidate: Optional[int] = None
+
+    @property
+    def fill_policy(self) -> FillPolicy:
+        return self._fill_policy
+
+    @property
+    def lost(self) -> int:
+        return self._lost
+
+    @property
+    def gaps(self) -> int:
+        return self._gaps
+
+    @property
+    def duplicates(self) -> int:
+        return self._duplicates
+
+    @property
+    def rejected(self) -> int:
+        return self._rejected
+
+    @property
+    def resyncs(self) -> int:
+        return self._resyncs
+
+    def _max_step(self, host_time: Optional[float]) -> int:
+        limit = SEQUENCE_MODULO // 2 - 1
+        if host_time is None or self._sampling_rate is None or self._last_time is None:
+            return limit
+
+        elapsed = max(host_time - self._last_time, 0.0) * SEQUENCE_RATE_SLACK + SEQUENCE_TIME_SLACK
+        return min(int(elapsed * self._sampling_rate) + SEQUENCE_STEP_SLACK, limit)
+
+    def _steps(self, index: ndarray) -> ndarray:
+        previous = empty(len(index), dtype=int64)
+        previous[1:] = index[:-1]
+        previous[0] = index[0] - 1 if self._last_index is None else self._last_index
+        return (index - previous) % SEQUENCE_MODULO
+
+    def _forward_source(self, slots: ndarray, total: int) -> ndarray:
+        source = full(total, -1, dtype=int64)
+        source[slots] = arange(len(slots))
+        return maximum.accumulate(source)
+
+    def _fill(self, slots: ndarray, total: int, data: ndarray) -> ndarray:
+        result = full((total, data.shape[1]), nan, dtype=float32)
+        result[slots] = data
+
+        if self._fill_policy == FillPolicy.HoldLast:
+            source = self._forward_source(slots, total)
+            held = source >= 0
+            result[held] = data[source[held]]
+            if self._last_data is not None:
+                result[~held] = self._last_data
+        elif self._fill_policy == FillPolicy.Linear:
+            grid = arange(total)
+            if self._last_data is not None:
+                slots = concatenate(([-1], slots))
+                data = concatenate((self._last_data[None, :], data))
+            for channel in range(data.shape[1]):
+                result[:, channel] = interp(grid, slots, data[:, channel])
+
+        return result
+
+    def _screen(self, index: ndarray, limit: int) -> tuple[ndarray, list[int]]:
+        # Slow path, only taken when some step is a duplicate or implausible.
+        # A lone implausible frame is dropped (most likely a corrupted counter)
+        # and only a second frame continuing it starts a new run.
+        keep = zeros(len(index), dtype=bool_)
+        runs = []
+
+        last = self._last_index
+        for position, value in enumerate(index.tolist()):
+            step = 1 if last is None else (value - last) % SEQUENCE_MODULO
+            if step == 0:
+                self._duplicates += 1
+                continue
+
+            if step <= limit:
+                self._candidate = None
+            elif self._candidate is not None and (value - self._candidate) % SEQUENCE_MODULO == 1:
+                self._candidate = None
+                self._resyncs += 1
+                runs.append(int(count_nonzero(keep)))
+            else:
+                self._candidate = value
+                self._rejected += 1
+                continue
+
+            keep[position] = True
+            last = value
+
+        return keep, runs
+
+    def _continue(self, index: ndarray, data: ndarray, position: ndarray) -> SampleBatch:
+        steps = self._steps(index)
+        if (lost := int(steps.sum()) - len(steps)) > 0:
+            self._lost += lost
+            self._gaps += count_nonzero(steps > 1)
+
+            slots = cumsum(steps) - 1
+            total = int(slots[-1]) + 1
+            first = int(index[0] - steps[0] + 1)
+
+            source = self._forward_source(slots, total)
+            filled_position = empty(total, dtype=uint8)
+            filled_position[source >= 0] = position[source[source >= 0]]
+            filled_position[source < 0] = position[0] if self._last_position is None else self._last_position
+
+            index = (first + arange(total)) % SEQUENCE_MODULO
+            data = self._fill(slots, total, data)
+            position = filled_position
+
+        self._last_index = int(index[-1])
+        self._last_data = data[-1].copy()
+        self._last_position = int(position[-1])
+
+        return SampleBatch(
+            index=index.astype(uint16),
+            data=data,
+            position=position
+        )
+
+    def process(self, batch: SampleBatch, host_time: Optional[float] = None) -> SampleBatch:
+        if batch.size == 0:
+            return batch
+
+        index = batch.index.astype(int64)
+        data = batch.data.astype(float32)
+        position = batch.position
+
+        limit = self._max_step(host_time)
+        steps = self._steps(index)
+        if ((steps == 0) | (steps > limit)).any():
+            keep, runs = self._screen(index, limit)
+            index, data, position = index[keep], data[keep], position[keep]
+            if len(index) == 0:
+                return SampleBatch(index=batch.index[:0], data=data, position=position)
+        else:
+            self._candidate = None
+            runs = []
+
+        # The gap before a resynchronised run is unknown, it is never filled
+        batches = []
+        for start, stop in zip([0] + runs, runs + [len(index)]):
+            if start == stop:
+                continue
+            if start in runs:
+                self._last_index = None
+            batches.append(self._continue(index[start:stop], data[start:stop], position[start:stop]))
+
+        if host_time is not None:
+            self._last_time = host_time
+
+        return concatenate_batches(batches)
@@ -0,0 +1,214 @@
+import logging
+import os
+from os.path import dirname
+from queue import Empty, Queue
+from struct import Struct
+from threading import Thread
+from time import monotonic, monotonic_ns
+from typing import BinaryIO, NamedTuple, Optional
+
+from numpy import float32, frombuffer, uint8, uint16
+
+from .buffer import SampleBatch, concatenate_batches
+
+logger = logging.getLogger('saccrec')
+
+STREAM_MAGIC = b'SACCLIV1'
+# Magic, sampling rate, channel count and then one byte per streamed channel number
+STREAM_HEADER = Struct('<8sIH')
+# Record type, test number or sample count and host monotonic time (ns)
+RECORD_HEADER = Struct('<cIQ')
+
+TEST_STARTED = b'T'
+TEST_FINISHED = b'E'
+SAMPLES = b'D'
+
+STREAM_BUFFERING = 1 << 20
+FSYNC_INTERVAL = 1.0
+WRITER_POLL = 0.1
+
+
+class StreamFormatError(IOError):
+    pass
+
+
+class StreamWriter(Thread):
+
+    # Appends the decoded batches of the acquisition worker to the live stream
+    # file. Disk latency only ever delays this thread, never the acquisition.
+
+    def __init__(
+        self,
+        path: str,
+        sampling_rate: int,
+        channels: list[int],
+        fsync_interval: float = FSYNC_INTERVAL
+    ):
+        super(StreamWriter, self).__init__(name='saccrec-stream-writer', daemon=True)
+
+        if directory := dirname(path):
+            os.makedirs(directory, exist_ok=True)
+
+        self._path = path
+        self._channels = channels
+        self._fsync_interval = fsync_interval
+        self._queue: Queue = Queue()
+
+        self._file: BinaryIO = open(path, 'wb', buffering=STREAM_BUFFERING)
+        self._file.write(STREAM_HEADER.pack(STREAM_MAGIC, sampling_rate, len(channels)))
+        self._file.write(bytes(channels))
+
+        self._samples = 0
+        self._error: Optional[Exception] = None
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def samples(self) -> int:
+        return self._samples
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    @property
+    def error(self) -> Optional[Exception]:
+        return self._error
+
+    def begin_test(self, number: int):
+        self._queue.put((TEST_STARTED, number, monotonic_ns()))
+
+    def end_test(self, number: int):
+        self._queue.put((TEST_FINISHED, number, monotonic_ns()))
+
+    def put(self, batch: SampleBatch):
+        if batch.size > 0:
+            self._queue.put((SAMPLES, batch, monotonic_ns()))
+
+    def stop(self, timeout: float = 5.0):
+        self._queue.put(None)
+        if self.is_alive():
+            self.join(timeout)
+
+    def _write(self, kind: bytes, payload, host_ns: int):
+        if kind != SAMPLES:
+            self._file.write(RECORD_HEADER.pack(kind, payload, host_ns))
+            return
+
+        batch = payload
+        self._file.write(RECORD_HEADER.pack(kind, batch.size, host_ns))
+        self._file.write(batch.index.astype('<u2').tobytes())
+        self._file.write(batch.position.astype(uint8).tobytes())
+        self._file.write(batch.data.astype('<f4').tobytes())
+        self._samples += batch.size
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def run(self):
+        last_sync = monotonic()
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=WRITER_POLL)
+                except Empty:
+                    item = ()
+
+                if item is None:
+                    break
+
+                if item:
+                    self._write(*item)
+
+                if self._fsync_interval > 0 and monotonic() - last_sync >= self._fsync_interval:
+                    self._sync()
+                    last_sync = monotonic()
+        except OSError as error:
+            self._error = error
+            logger.error(_('Live stream file {path} not written: {error}').format(
+                path=self._path,
+                error=error
+            ))
+        finally:
+            try:
+                self._sync()
+            except OSError:
+                pass
+            self._file.close()
+
+
+class StreamTest(NamedTuple):
+    number: int
+    started_at: int
+    finished_at: Optional[int]
+    samples: SampleBatch
+
+
+class StreamFile(NamedTuple):
+    sampling_rate: int
+    channels: list[int]
+    tests: list[StreamTest]
+
+
+def read_stream(path: str) -> StreamFile:
+    with open(path, 'rb') as f:
+        content = f.read()
+
+    if len(content) < STREAM_HEADER.size:
+        raise StreamFormatError(f'{path} is not a live stream file')
+
+    magic, sampling_rate, count = STREAM_HEADER.unpack_from(content)
+    if magic != STREAM_MAGIC:
+        raise StreamFormatError(f'{path} is not a live stream file')
+
+    offset = STREAM_HEADER.size
+    channels = list(content[offset:offset + count])
+    offset += count
+
+    tests = []
+    current = None
+    batches = []
+
+    def close_test(finished_at: Optional[int]):
+        if current is not None:
+            samples = concatenate_batches(batches) if batches else SampleBatch(
+                index=frombuffer(b'', dtype=uint16),
+                data=frombuffer(b'', dtype=float32).reshape(0, count),
+                position=frombuffer(b'', dtype=uint8)
+            )
+            tests.append(StreamTest(current[0], current[1], finished_at, samples))
+
+    # A crash can leave a truncated record at the end, everything before it is kept
+    while offset + RECORD_HEADER.size <= len(content):
+        kind, value, host_ns = RECORD_HEADER.unpack_from(content, offset)
+        offset += RECORD_HEADER.size
+
+        if kind == SAMPLES:
+            size = value * (2 + 1 + 4 * count)
+            if offset + size > len(content):
+                break
+
+            index = frombuffer(content, dtype='<u2', count=value, offset=offset)
+            position = frombuffer(content, dtype=uint8, count=value, offset=offset + 2 * value)
+            data = frombuffer(content, dtype='<f4', count=value * count, offset=offset + 3 * value)
+            batches.append(SampleBatch(
+                index=index.astype(uint16),
+                data=data.astype(float32).reshape(value, count),
+                position=position.copy()
+            ))
+            offset += size
+        elif kind == TEST_STARTED:
+            close_test(None)
+            current, batches = (value, host_ns), []
+        elif kind == TEST_FINISHED:
+            close_test(host_ns)
+            current, batches = None, []
+        else:
+            raise StreamFormatError(f'Unknown record {kind!r} in {path}')
+
+    close_test(None)
+
+    return StreamFile(sampling_rate, channels, tests)
@@ -0,0 +1,71 @@
+from time import monotonic
+from typing import NamedTuple
+
+RATE_WINDOW = 1.0
+
+
+class TelemetrySnapshot(NamedTuple):
+    bytes_rate: float
+    frames_rate: float
+    resyncs: int
+    sync_losses: int
+    invalid_positions: int
+    waiting_peak: int
+    decode_time: float
+    decode_time_peak: float
+    backlog: int
+    lost_samples: int
+    cpu_usage: float
+
+    @property
+    def json(self) -> dict:
+        return self._asdict()
+
+
+class Telemetry:
+
+    # Written by the acquisition worker and read from the GUI: only plain
+    # numbers are stored, so a snapshot never needs a lock
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._frames = 0
+        self._window_start = monotonic()
+        self._window_bytes = 0
+        self._window_frames = 0
+
+        self._bytes_rate = 0.0
+        self._frames_rate = 0.0
+        self._decode_time = 0.0
+        self._decode_time_peak = 0.0
+
+    @property
+    def bytes_rate(self) -> float:
+        return self._bytes_rate
+
+    @property
+    def frames_rate(self) -> float:
+        return self._frames_rate
+
+    @property
+    def decode_time(self) -> float:
+        return self._decode_time
+
+    @property
+    def decode_time_peak(self) -> float:
+        return self._decode_time_peak
+
+    def record(self, received: int, frames: int, decode_time: float):
+        if frames > 0:
+            self._frames += frames
+            self._decode_time = decode_time
+            self._decode_time_peak = max(self._decode_time_peak, decode_time)
+
+        if (elapsed := (now := monotonic()) - self._window_start) >= RATE_WINDOW:
+            self._bytes_rate = (received - self._window_bytes) / elapsed
+            self._frames_rate = (self._frames - self._window_frames) / elapsed
+            self._window_start = now
+            self._window_bytes = received
+            self._window_frames = self._frames
@@ -13,15 +13,15 @@ def main():
     for i in range(10):
         sleep(1)
         board.marker('l')
-        board.read()
+        board.samples()
         sleep(1)
         board.marker('r')
-        board.read()
+        board.samples()
     sleep(1)
     board.marker('c')
-    board.read()
+    board.samples()
     sleep(1)
-    board.read()
+    board.samples()
     board.stop()
 
     board.marker('c')
@@ -29,15 +29,15 @@ def main():
     for i in range(20):
         sleep(1)
         board.marker('l')
-        board.read()
+        board.samples()
         sleep(1)
         board.marker('r')
-        board.read()
+        board.samples()
     sleep(1)
     board.marker('c')
-    board.read()
+    board.samples()
     sleep(1)
-    board.read()
+    board.samples()
     board.stop()
 
     board.marker('c')
@@ -45,15 +45,15 @@ def main():
     for i in range(10):
         sleep(1)
         board.marker('l')
-        board.read()
+        board.samples()
         sleep(1)
         board.marker('r')
-        board.read()
+        board.samples()
     sleep(1)
     board.marker('c')
-    board.read()
+    board.samples()
     sleep(1)
-    board.read()
+    board.samples()
     board.stop()
 
     board.close_sd_file()
@@ -0,0 +1,88 @@
+from numpy import arange, array, float32, full, int64, uint8, uint16
+
+from saccrec.core.enums import FillPolicy
+from saccrec.recording.buffer import SampleBatch
+from saccrec.recording.sequence import SEQUENCE_MODULO, SequenceTracker
+
+RATE = 1000
+
+
+def make_batch(index) -> SampleBatch:
+    index = array(index, dtype=int64) % SEQUENCE_MODULO
+    data = (index[:, None] * array([1, -1])).astype(float32)
+    return SampleBatch(
+        index=index.astype(uint16),
+        data=data,
+        position=full(len(index), 0x01, dtype=uint8)
+    )
+
+
+def stream(tracker: SequenceTracker, chunks, period: float = 0.01):
+    batches = []
+    for number, index in enumerate(chunks):
+        batches.append(tracker.process(make_batch(index), host_time=number * period))
+    return batches
+
+
+def test_bit_flipped_index():
+    tracker = SequenceTracker(FillPolicy.Linear, RATE)
+
+    chunks = [list(range(start, start + 10)) for start in range(0, 100, 10)]
+    chunks[3][4] ^= 0x4000
+
+    batches = stream(tracker, chunks)
+
+    assert tracker.rejected == 1
+    assert tracker.resyncs == 0
+    assert tracker.lost == 1
+    assert [batch.size for batch in batches] == [10] * 10
+    assert batches[3].index.tolist() == list(range(30, 40))
+    # The dropped frame is interpolated from its neighbours
+    assert batches[3].data[4, 0] == 34
+
+
+def test_wrap():
+    tracker = SequenceTracker(FillPolicy.Linear, RATE)
+
+    start = SEQUENCE_MODULO - 15
+    batches = stream(tracker, [range(start + offset, start + offset + 10) for offset in range(0, 30, 10)])
+
+    assert tracker.lost == 0
+    assert tracker.rejected == 0
+    assert [batch.size for batch in batches] == [10, 10, 10]
+    assert batches[1].index.tolist() == [*range(SEQUENCE_MODULO - 5, SEQUENCE_MODULO), *range(5)]
+
+
+def test_real_gap():
+    tracker = SequenceTracker(FillPolicy.Linear, RATE)
+
+    batches = stream(tracker, [range(0, 10), range(10, 20), range(220, 230)], period=0.2)
+
+    assert tracker.lost == 200
+    assert tracker.gaps == 1
+    assert tracker.rejected == 0
+    assert batches[2].size == 210
+    assert batches[2].index.tolist() == list(range(20, 230))
+    assert batches[2].data[:, 0].tolist() == list(arange(20, 230, dtype=float32))
+
+
+def test_gap_beyond_elapsed_time_resyncs():
+    tracker = SequenceTracker(FillPolicy.Linear, RATE)
+
+    # A rebooted board starts counting again, two frames agree on the new run
+    batches = stream(tracker, [range(1000, 1010), range(1010, 1020), [5000], range(5001, 5010)])
+
+    assert tracker.rejected == 1
+    assert tracker.resyncs == 1
+    assert tracker.lost == 0
+    assert batches[2].size == 0
+    assert batches[3].index.tolist() == list(range(5001, 5010))
+
+
+def test_duplicates_are_dropped():
+    tracker = SequenceTracker(FillPolicy.Linear, RATE)
+
+    batch = tracker.process(make_batch([0, 1, 1, 2, 3]), host_time=0.0)
+
+    assert tracker.duplicates == 1
+    assert batch.index.tolist() == [0, 1, 2, 3]
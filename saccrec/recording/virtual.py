@@ -0,0 +1,345 @@
+import os
+import tty
+from argparse import ArgumentParser
+from select import select
+from threading import Event, Thread
+from time import monotonic, sleep
+from typing import Optional
+
+from numpy import arange, clip, exp, int64, pi, sin, zeros
+from numpy.random import default_rng
+
+from saccrec.core.enums import CYTON_SAMPLE_RATE_CODES
+
+from .decoder import EOG_CHANNELS, frame_dtype
+
+VIRTUAL_VERSION = 'v3.1.2'
+
+# Cyton '~N' codes
+SAMPLE_RATE_CODES = {code: rate for rate, code in CYTON_SAMPLE_RATE_CODES.items()}
+
+MARKER_POSITIONS = {
+    'l': 0x01,
+    'r': 0x02,
+    't': 0x04,
+    'b': 0x08,
+    'c': 0x10,
+}
+
+COMMAND_LENGTHS = {
+    'v': 1,
+    'S': 1,
+    'j': 1,
+    '(': 1,
+    ')': 1,
+    '~': 2,
+    'O': 2,
+    'N': 3,
+    'x': 9,
+    'z': 5,
+}
+
+# Rough firmware timings, the SD commands touch the card
+RESPONSE_DELAYS = {
+    'v': 0.010,
+    'S': 0.150,
+    'j': 0.080,
+}
+RESPONSE_DELAY = 0.002
+
+STREAM_TICK = 0.001
+
+BASELINE = 1 << 23
+SACCADE_AMPLITUDE = 40000
+SACCADE_TIME_CONSTANT = 0.015
+NOISE_LEVEL = 300
+
+# Lead-off drive as the firmware configures it, seen through a gain of 24
+LEAD_OFF_FREQUENCY = 31.2
+LEAD_OFF_CURRENT = 6e-9
+SERIES_RESISTANCE = 2200
+VOLTS_PER_COUNT = 4.5 / 24 / ((1 << 23) - 1)
+ELECTRODE_IMPEDANCE = 5000
+
+
+class VirtualBoard(Thread):
+
+    # Answers the OpenEOG command protocol on the master side of a pty, so
+    # CytonBoard can open the slave path as if it was the USB dongle
+
+    def __init__(
+        self,
+        sampling_rate: int = 1000,
+        channels: int = EOG_CHANNELS,
+        seed: Optional[int] = None,
+        electrode_impedance: float = ELECTRODE_IMPEDANCE
+    ):
+        super(VirtualBoard, self).__init__(name='saccrec-virtual-board', daemon=True)
+
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._slave)
+        self._port = os.ttyname(self._slave)
+
+        self._sampling_rate = sampling_rate
+        self._channels = channels
+        self._random = default_rng(seed)
+
+        self._input = bytearray()
+        self._responses: list[tuple[float, bytes]] = []
+        self._commands: list[str] = []
+
+        self._streaming = False
+        self._stream_start = 0.0
+        self._sent = 0
+        self._index = 0
+        self._position = MARKER_POSITIONS['c']
+        self._level = zeros(channels)
+        self._stream_channels = list(range(1, channels + 1))
+        self._lead_off: set[int] = set()
+        self._electrode_impedance = electrode_impedance
+
+        self._sd_files = 0
+        self._frames_sent = 0
+        self._dropped_bytes = 0
+
+        self._stopped = Event()
+
+    @property
+    def port(self) -> str:
+        return self._port
+
+    @property
+    def sampling_rate(self) -> int:
+        return self._sampling_rate
+
+    @sampling_rate.setter
+    def sampling_rate(self, value: int):
+        self._sampling_rate = value
+        self._restart_clock()
+
+    @property
+    def channels(self) -> int:
+        return self._channels
+
+    @property
+    def streaming(self) -> bool:
+        return self._streaming
+
+    @property
+    def commands(self) -> list[str]:
+        return list(self._commands)
+
+    @property
+    def frames_sent(self) -> int:
+        return self._frames_sent
+
+    @property
+    def dropped_bytes(self) -> int:
+        return self._dropped_bytes
+
+    def stop(self, timeout: float = 1.0):
+        self._stopped.set()
+        if self.is_alive():
+            self.join(timeout)
+
+        for fd in (self._master, self._slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def _restart_clock(self, delay: float = 0.0):
+        self._stream_start = monotonic() + delay
+        self._sent = 0
+
+    def _respond(self, message: str, delay: float = RESPONSE_DELAY):
+        self._responses.append((monotonic() + delay, f'{message}$$$'.encode('ASCII')))
+
+    def _handle(self, cmd: str):
+        self._commands.append(cmd)
+        head = cmd[0]
+
+        if head == 'O':
+            self._position = MARKER_POSITIONS.get(cmd[1], self._position)
+            return
+
+        delay = RESPONSE_DELAYS.get(head, RESPONSE_DELAY)
+        if head == 'v':
+            self._respond(f'[MSG] OpenEOG {VIRTUAL_VERSION} (virtual)', delay)
+        elif head == '~':
+            if (rate := SAMPLE_RATE_CODES.get(cmd[1])) is None:
+                self._respond('[ERR] Sample value out of bounds', delay)
+            else:
+                self.sampling_rate = rate
+                self._respond(f'[MSG] Sample rate set to {rate}Hz', delay)
+        elif head == 'N':
+            self._set_channels([int(cmd[1]), int(cmd[2])])
+            self._respond(f'[MSG] EOG channels {cmd[1]} {cmd[2]}', delay)
+        elif head == 'z':
+            if cmd[-1] != 'Z':
+                self._respond('[ERR] too few chars', delay)
+            else:
+                if cmd[2] == '1':
+                    self._lead_off.add(int(cmd[1]))
+                else:
+                    self._lead_off.discard(int(cmd[1]))
+                self._respond(f'[MSG] Lead off set for channel {cmd[1]}', delay)
+        elif head == 'x':
+            if cmd[-1] != 'X':
+                self._respond('[ERR] too few chars', delay)
+            else:
+                self._respond(f'[MSG] Channel {cmd[1]} set', delay)
+        elif head == 'S':
+            self._sd_files += 1
+            self._respond(f'[MSG] Opening file {self._sd_files:06X}.EOG', delay)
+        elif head == 'j':
+            self._respond('[MSG] SD file closed', delay)
+        elif head == '(':
+            self._streaming = True
+            self._index = 0
+            # Like the firmware, the first frame follows the response
+            self._restart_clock(delay)
+            self._respond('[MSG] Stream started', delay)
+        elif head == ')':
+            self._streaming = False
+            self._respond('[MSG] Stream stopped', delay)
+
+    def _set_channels(self, channels: list[int]):
+        self._stream_channels = channels
+        if len(channels) != self._channels:
+            self._channels = len(channels)
+            self._level = zeros(self._channels)
+
+    def _parse(self):
+        while self._input:
+            head = chr(self._input[0])
+            if (length := COMMAND_LENGTHS.get(head)) is None:
+                del self._input[0]
+                continue
+
+            if len(self._input) < length:
+                break
+
+            cmd = self._input[:length].decode('ASCII', errors='replace')
+            del self._input[:length]
+            self._handle(cmd)
+
+    def _targets(self):
+        targets = zeros(self._channels)
+        targets[0] = {0x01: -1, 0x02: 1}.get(self._position, 0) * SACCADE_AMPLITUDE
+        if self._channels > 1:
+            targets[1] = {0x04: 1, 0x08: -1}.get(self._position, 0) * SACCADE_AMPLITUDE
+        return targets
+
+    def _frames(self, count: int) -> bytes:
+        frames = zeros(count, dtype=frame_dtype(self._channels))
+        frames['index'] = (self._index + arange(count)) % (1 << 16)
+        frames['position'] = self._position
+
+        # First order approach to the stimulus position, like a saccade seen
+        # through the EOG amplifier, plus white noise
+        targets = self._targets()
+        decay = exp(-arange(1, count + 1) / (SACCADE_TIME_CONSTANT * self._sampling_rate))
+        signal = targets + (self._level - targets) * decay[:, None]
+        self._level = signal[-1]
+
+        values = signal + self._random.normal(0, NOISE_LEVEL, signal.shape)
+
+        if self._lead_off:
+            time = (self._index + arange(count)) / self._sampling_rate
+            drive = sin(2 * pi * LEAD_OFF_FREQUENCY * time)
+            amplitude = LEAD_OFF_CURRENT * (self._electrode_impedance + SERIES_RESISTANCE) / VOLTS_PER_COUNT
+            for column, channel in enumerate(self._stream_channels):
+                if channel in self._lead_off:
+                    values[:, column] += amplitude * drive
+        values = clip(values + BASELINE, 0, (1 << 24) - 1).astype(int64)
+        for byte in range(3):
+            frames['samples'][..., byte] = (values >> (8 * (2 - byte))) & 0xFF
+
+        self._index += count
+        return frames.tobytes()
+
+    def _write(self, data: bytes) -> int:
+        try:
+            return os.write(self._master, data)
+        except BlockingIOError:
+            return 0
+
+    def _stream(self):
+        due = int((monotonic() - self._stream_start) * self._sampling_rate) - self._sent
+        if due <= 0:
+            return
+
+        data = self._frames(due)
+        written = self._write(data)
+        self._sent += due
+        self._frames_sent += written // frame_dtype(self._channels).itemsize
+
+        # Like the dongle FIFO, whatever the host does not take in time is lost
+        self._dropped_bytes += len(data) - written
+
+    def run(self):
+        os.set_blocking(self._master, False)
+
+        while not self._stopped.is_set():
+            timeout = STREAM_TICK if self._streaming else 0.01
+            if self._responses:
+                timeout = max(0, min(timeout, self._responses[0][0] - monotonic()))
+
+            try:
+                readable = select([self._master], [], [], timeout)[0]
+                if readable:
+                    self._input += os.read(self._master, 4096)
+                    self._parse()
+            except BlockingIOError:
+                pass
+            except OSError:
+                break
+
+            now = monotonic()
+            while self._responses and self._responses[0][0] <= now:
+                self._write(self._responses.pop(0)[1])
+
+            if self._streaming:
+                self._stream()
+
+
+def benchmark(rates: list[int], duration: float):
+    from saccrec.settings import hardware as conf
+
+    from .openeog import CytonBoard
+    from .selftest import run_self_test
+
+    print(f'{"Rate":>8} {"Delivered":>10} {"Headroom":>9} {"Lost":>8} {"Backlog":>8} {"Dropped":>10}')
+    for rate in rates:
+        virtual = VirtualBoard(rate)
+        virtual.start()
+
+        conf.override_sampling_rate(rate)
+        board = CytonBoard.reset(port=virtual.port)
+
+        report = run_self_test(board, duration=duration, sampling_rate=rate)
+        print(
+            f'{rate:>8} {report.delivery:>9.1f}% {report.headroom:>8.1f}% '
+            f'{report.lost:>8} {report.backlog_growth:>8} {virtual.dropped_bytes:>10}'
+        )
+
+        board.close()
+        virtual.stop()
+        sleep(0.1)
+
+
+def main():
+    parser = ArgumentParser(description='Stream from a virtual OpenEOG board and report the pipeline headroom')
+    parser.add_argument('--rates', type=int, nargs='+', default=sorted(SAMPLE_RATE_CODES.values()))
+    parser.add_argument('--duration', type=float, default=3.0)
+    args = parser.parse_args()
+
+    from saccrec import setup_i18n
+    setup_i18n()
+
+    benchmark(args.rates, args.duration)
+
+
+if __name__ == '__main__':
+    main()
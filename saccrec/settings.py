@@ -1,10 +1,10 @@
-from json import loads
+from json import dumps, loads
 from os.path import exists, expanduser, join
 from typing import Optional
 
 from PySide6 import QtCore, QtGui, QtWidgets
 
-from saccrec.core.enums import Gain
+from saccrec.core.enums import CYTON_SAMPLE_RATE_CODES, BacklogPolicy, FillPolicy, Gain, SamplingRate
 from saccrec.core.screen import Screen
 
 _settings = QtCore.QSettings()
@@ -58,6 +58,14 @@ class _GUISettings:
     def current_protocol(self, value: str):
         _settings.setValue('GUI/CurrentProtocol', value)
 
+    @property
+    def stream_fsync_interval(self) -> float:
+        return float(_settings.value('GUI/StreamFsyncInterval', 1.0))
+
+    @stream_fsync_interval.setter
+    def stream_fsync_interval(self, value: float):
+        _settings.setValue('GUI/StreamFsyncInterval', value)
+
     @property
     def sd_path(self) -> str:
         return _settings.value('GUI/SDPath', expanduser('~'))
@@ -164,6 +172,7 @@ class _HardwareSettings:
 
     def __init__(self):
         self._channels = _Channels()
+        self._sampling_rate_override: Optional[int] = None
 
     @property
     def port(self) -> str:
@@ -171,8 +180,8 @@ class _HardwareSettings:
         if port and exists(port):
             return port
 
-        from saccrec.recording import CytonBoard
-        ports = CytonBoard.list_ports()
+        from saccrec.recording import PortDiscovery
+        ports = PortDiscovery.instance().ports
         if ports and exists(ports[0]):
             _settings.setValue('Hardware/Port', ports[0])
             return ports[0]
@@ -186,14 +195,69 @@ class _HardwareSettings:
     def port(self, value: str):
         _settings.setValue('Hardware/Port', value)
 
+    # Read and written from the port discovery thread, so every access goes
+    # through its own QSettings object instead of the shared one
+    @property
+    def known_boards(self) -> dict[str, str]:
+        if (json := QtCore.QSettings().value('Hardware/KnownBoards', None)) is not None:
+            return loads(json)
+        return {}
+
+    @known_boards.setter
+    def known_boards(self, value: dict[str, str]):
+        QtCore.QSettings().setValue('Hardware/KnownBoards', dumps(value))
+
     @property
     def sampling_rate(self) -> int:
-        return int(_settings.value('Hardware/SamplingRate', 1000))
+        if self._sampling_rate_override is not None:
+            return self._sampling_rate_override
+
+        rate = int(_settings.value('Hardware/SamplingRate', 1000))
+        if rate not in SamplingRate.__members__.values():
+            return SamplingRate.SR1000.value
+        return rate
 
     @sampling_rate.setter
     def sampling_rate(self, value: int):
         _settings.setValue('Hardware/SamplingRate', value)
 
+    # Session only, used by the virtual board which streams at rates the
+    # Cyton firmware has no '~' code for
+    def override_sampling_rate(self, value: Optional[int]):
+        self._sampling_rate_override = value
+
+    @property
+    def backlog_limit(self) -> int:
+        return int(_settings.value('Hardware/BacklogLimit', 1000))
+
+    @backlog_limit.setter
+    def backlog_limit(self, value: int):
+        _settings.setValue('Hardware/BacklogLimit', value)
+
+    @property
+    def backlog_policy(self) -> BacklogPolicy:
+        return BacklogPolicy(_settings.value('Hardware/BacklogPolicy', BacklogPolicy.DropOldest.value))
+
+    @backlog_policy.setter
+    def backlog_policy(self, value: BacklogPolicy):
+        _settings.setValue('Hardware/BacklogPolicy', value.value)
+
+    @property
+    def stall_timeout(self) -> int:
+        return int(_settings.value('Hardware/StallTimeout', 500))
+
+    @stall_timeout.setter
+    def stall_timeout(self, value: int):
+        _settings.setValue('Hardware/StallTimeout', value)
+
+    @property
+    def fill_policy(self) -> FillPolicy:
+        return FillPolicy(_settings.value('Hardware/FillPolicy', FillPolicy.Linear.value))
+
+    @fill_policy.setter
+    def fill_policy(self, value: FillPolicy):
+        _settings.setValue('Hardware/FillPolicy', value.value)
+
     @property
     def horizontal_channel(self) -> int:
         return int(_settings.value('Hardware/HorizontalChannel', 1))
@@ -214,6 +278,20 @@ class _HardwareSettings:
     def eog_channels_command(self) -> str:
         return f'N{self.horizontal_channel}{self.vertical_channel}'
 
+    @property
+    def raw_capture(self) -> bool:
+        return _settings.value('Hardware/RawCapture', '0') == '1'
+
+    @raw_capture.setter
+    def raw_capture(self, value: bool):
+        _settings.setValue('Hardware/RawCapture', '1' if value else '0')
+
+    @property
+    def sampling_rate_command(self) -> Optional[str]:
+        if (code := CYTON_SAMPLE_RATE_CODES.get(self.sampling_rate)) is None:
+            return None
+        return f'~{code}'
+
     @property
     def channels(self) -> _Channels:
         return self._channels